@@ -0,0 +1,663 @@
+"""Benchmark suite for yaptool.py.
+
+Run all benchmarks with `python benchmark_yaptool.py`, or only some of them
+with `python benchmark_yaptool.py <name> [<name> ...]`.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List
+
+import matplotlib  # type: ignore
+
+matplotlib.use("Agg")
+
+# pylint: disable=wrong-import-position
+import matplotlib.figure  # type: ignore
+import matplotlib.pyplot as plt  # type: ignore
+import numpy as np
+import PIL.Image
+
+import yaptool as yap
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {}
+
+####################
+# Internal helpers #
+####################
+
+
+def _benchmark(func: Callable[[], None]) -> Callable[[], None]:
+    ''' Registers a benchmark under its name without the bench_ prefix '''
+    BENCHMARKS[func.__name__.removeprefix("bench_")] = func
+    return func
+
+
+@contextmanager
+def _count_draws() -> Iterator[List[int]]:
+    ''' Counts calls of Figure.draw() within the context '''
+    counter = [0]
+    original = matplotlib.figure.Figure.draw
+
+    def draw(self, renderer):
+        counter[0] += 1
+        return original(self, renderer)
+
+    setattr(matplotlib.figure.Figure, "draw", draw)
+    try:
+        yield counter
+    finally:
+        setattr(matplotlib.figure.Figure, "draw", original)
+
+
+def _best_of(func: Callable[[], object], repeat: int = 5) -> float:
+    ''' Returns the best wall time of several runs of func in seconds '''
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _report(name: str, **values: float) -> None:
+    ''' Prints one line of benchmark results '''
+    text = ", ".join(f"{key}={value:.4g}" for key, value in values.items())
+    print(f"{name:<40} {text}")
+
+
+##############
+# Benchmarks #
+##############
+
+
+@_benchmark
+def bench_import() -> None:
+    """Cold-start latency of importing yaptool in a fresh interpreter."""
+    for name, code in (("python", "pass"), ("import yaptool",
+                                            "import yaptool"),
+                       ("import yaptool + singleplot",
+                        "import yaptool; yaptool.use_backend();"
+                        "yaptool.singleplot(pyplot=False)"),
+                       ("import matplotlib.pyplot",
+                        "import matplotlib.pyplot")):
+
+        def run(code: str = code) -> None:
+            subprocess.run([sys.executable, "-c", code], check=True)
+
+        _report(name, seconds=_best_of(run))
+
+    # Attribute lookups through the lazy module proxies, once loaded
+    lookups = 100000
+    for name, module in (("np.asarray", np), ("yap.np.asarray", yap.np)):
+
+        def lookup(module=module) -> None:
+            for _ in range(lookups):
+                _ = module.asarray
+
+        _report(name, microseconds=_best_of(lookup) / lookups * 1e6)
+
+
+@_benchmark
+def bench_save_formats() -> None:
+    """save_formats() versus consecutive save_png/svg/pdf calls."""
+    _, ax = yap.singleplot()
+    ax.plot(range(1000), range(1000))
+    yap.labels(ax, "x", "y")
+    with tempfile.TemporaryDirectory() as tmp:
+
+        def separate():
+            yap.save_png(f"{tmp}/a.png")
+            yap.save_svg(f"{tmp}/a.svg")
+            yap.save_pdf(f"{tmp}/a.pdf")
+
+        def combined():
+            yap.save_formats(f"{tmp}/b")
+
+        for name, func in (("save_png+save_svg+save_pdf", separate),
+                           ("save_formats", combined)):
+            with _count_draws() as draws:
+                func()
+            _report(name, draws=draws[0], seconds=_best_of(func))
+    plt.close()
+
+
+@_benchmark
+def bench_tight_layout() -> None:
+    """save_png() and save_svg(), measuring the tight bounding box per
+    export or reusing it from the layout cache, against bbox_inches="tight"."""
+    rng = np.random.default_rng(0)
+    fig, ax = yap.multiplot(3, 3, (9, 9), pyplot=False)
+    for axis in ax.flat:
+        axis.plot(rng.random((20, 300)))
+        for i in range(50):
+            axis.text(*rng.random(2), f"text {i}")
+    yap.labels(ax, "x", "y")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, func in (
+            ("savefig png tight",
+             lambda: fig.savefig(f"{tmp}/a.png", dpi=100, bbox_inches="tight")
+             ),
+            ("save_png", lambda: yap.save_png(f"{tmp}/a.png", 100, fig)),
+            ("save_png layout",
+             lambda: yap.save_png(f"{tmp}/a.png", 100, fig, layout="bench")),
+            ("savefig svg tight",
+             lambda: fig.savefig(f"{tmp}/a.svg", bbox_inches="tight")),
+            ("save_svg", lambda: yap.save_svg(f"{tmp}/a.svg", fig)),
+            ("save_svg layout",
+             lambda: yap.save_svg(f"{tmp}/a.svg", fig, layout="bench")),
+        ):
+            with _count_draws() as draws:
+                func()
+            _report(name, draws=draws[0], seconds=_best_of(func, repeat=3))
+
+
+@_benchmark
+def bench_save_png_sizes() -> None:
+    """save_png_sizes() versus one save_png() call per resolution."""
+    x, y = np.random.default_rng(0).standard_normal((2, 20000))
+    dpis = (300, 150, 72, 24)
+    for chart, plot in (("line", lambda ax: ax.plot(x.cumsum())),
+                        ("scatter", lambda ax: ax.scatter(x, y, s=2))):
+        fig, ax = yap.singleplot(pyplot=False)
+        plot(ax)
+        yap.labels(ax, "x", "y")
+        with tempfile.TemporaryDirectory() as tmp:
+
+            def separate(fig=fig, tmp=tmp):
+                for dpi in dpis:
+                    yap.save_png(f"{tmp}/a_{dpi}.png", dpi=dpi, fig=fig)
+
+            def combined(fig=fig, tmp=tmp):
+                yap.save_png_sizes(f"{tmp}/b", dpis=dpis, fig=fig)
+
+            for name, func in (("save_png per resolution", separate),
+                               ("save_png_sizes", combined)):
+                with _count_draws() as draws:
+                    func()
+                _report(f"{chart}: {name}",
+                        draws=draws[0],
+                        seconds=_best_of(func, repeat=3))
+
+
+@_benchmark
+def bench_save_svg() -> None:
+    """save_svg_compact() versus save_svg(), in file size and write time."""
+    x, y = np.random.default_rng(0).standard_normal((2, 20000))
+    fig, ax = yap.singleplot(pyplot=False)
+    ax.scatter(x, y, s=2)
+    ax.plot(np.linspace(-4, 4, 1000), np.sin(np.linspace(-4, 4, 1000)))
+    yap.labels(ax, "x", "y")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, func in (
+            ("save_svg", lambda: yap.save_svg(f"{tmp}/a.svg", fig=fig)),
+            ("save_svg_compact",
+             lambda: yap.save_svg_compact(f"{tmp}/a.svg", fig=fig)),
+            ("save_svg_compact keep_text", lambda: yap.save_svg_compact(
+                f"{tmp}/a.svg", keep_text=True, fig=fig)),
+        ):
+            seconds = _best_of(func, repeat=3)
+            _report(name,
+                    kilobytes=os.path.getsize(f"{tmp}/a.svg") // 1024,
+                    seconds=seconds)
+
+
+@_benchmark
+def bench_async_export() -> None:
+    """AsyncExporter versus save_png() for a series of figures."""
+
+    def series(export):
+        for i in range(20):
+            fig, ax = yap.singleplot(size=(6, 4), pyplot=False)
+            ax.plot(range(1000), [i * x for x in range(1000)])
+            yap.labels(ax, "x", "y")
+            export(fig, i)
+
+    with tempfile.TemporaryDirectory() as tmp:
+
+        def blocking():
+            series(lambda fig, i: yap.save_png(f"{tmp}/{i}.png", fig=fig))
+
+        def background():
+            with yap.AsyncExporter() as exporter:
+                series(lambda fig, i: exporter.save_png(f"{tmp}/{i}.png",
+                                                        fig=fig))
+
+        _report("save_png", seconds=_best_of(blocking, repeat=2))
+        _report("AsyncExporter.save_png",
+                seconds=_best_of(background, repeat=2))
+
+
+@_benchmark
+def bench_pdf_report() -> None:
+    """PdfReport versus one save_pdf() call per page, for a 50 page report."""
+    x = np.random.default_rng(0).standard_normal(1000).cumsum()
+    with tempfile.TemporaryDirectory() as tmp:
+
+        def plot(i):
+            fig, ax = yap.multiplot(1, 2, (6, 3), pyplot=False)
+            ax[0].plot(x[i:])
+            ax[1].hist(x[i:], bins=20)
+            yap.labels(ax, f"page {i}", "value")
+            return fig
+
+        def separate():
+            for i in range(50):
+                yap.save_pdf(f"{tmp}/page_{i}.pdf", fig=plot(i), close=True)
+
+        def report():
+            with yap.PdfReport(f"{tmp}/report.pdf") as pdf:
+                for i in range(50):
+                    pdf.add(plot(i))
+
+        for name, func, files in (("save_pdf per page", separate, "page_"),
+                                  ("PdfReport", report, "report")):
+            seconds = _best_of(func, repeat=1)
+            size = sum(
+                os.path.getsize(f"{tmp}/{file}") for file in os.listdir(tmp)
+                if file.startswith(files))
+            _report(name, kilobytes=size // 1024, seconds=seconds)
+
+
+@_benchmark
+def bench_figure_pool() -> None:
+    """FigurePool versus building a new figure per chart."""
+
+    def chart(fig, ax):
+        ax.plot(range(100), range(100))
+        yap.despine(ax)
+        fig.canvas.draw()
+
+    def fresh():
+        for _ in range(50):
+            chart(*yap.singleplot(size=(4, 3), pyplot=False))
+
+    pool = yap.FigurePool()
+
+    def pooled():
+        for _ in range(50):
+            fig, ax = pool.singleplot(size=(4, 3))
+            chart(fig, ax)
+            pool.release(fig)
+
+    _report("singleplot per chart", seconds=_best_of(fresh, repeat=3))
+    _report("FigurePool", seconds=_best_of(pooled, repeat=3), **pool.stats())
+
+
+@_benchmark
+def bench_decimated_line() -> None:
+    """decimated_line() versus ax.plot() for a 10M point series."""
+    x = np.arange(10_000_000, dtype=float)
+    y = np.cumsum(np.random.default_rng(0).standard_normal(len(x)))
+    for name, plot in (("ax.plot", lambda ax: ax.plot(x, y)),
+                       ("decimated_line",
+                        lambda ax: yap.decimated_line(ax, x, y))):
+        fig, ax = yap.singleplot(pyplot=False)
+        start = time.perf_counter()
+        plot(ax)
+        fig.canvas.draw()
+        seconds = time.perf_counter() - start
+        _report(name,
+                seconds=seconds,
+                draw_seconds=_best_of(fig.canvas.draw, repeat=3),
+                svg_mb=len(yap.to_bytes("svg", fig=fig)) / 1e6)
+
+
+@_benchmark
+def bench_density_scatter() -> None:
+    """density_scatter() versus ax.scatter() for a 1M point cloud."""
+    x, y = np.random.default_rng(0).standard_normal((2, 1_000_000))
+    for name, plot in (("ax.scatter", lambda ax: ax.scatter(x, y, s=1)),
+                       ("density_scatter",
+                        lambda ax: yap.density_scatter(ax, x, y))):
+        fig, ax = yap.singleplot(pyplot=False)
+        start = time.perf_counter()
+        plot(ax)
+        fig.canvas.draw()
+        seconds = time.perf_counter() - start
+        _report(name,
+                seconds=seconds,
+                pdf_mb=len(yap.to_bytes("pdf", fig=fig)) / 1e6)
+
+
+@_benchmark
+def bench_lines() -> None:
+    """lines() versus one ax.plot() call per series for 2000 series."""
+    ys = np.cumsum(np.random.default_rng(0).standard_normal((2000, 500)),
+                   axis=1)
+
+    def loop(ax):
+        for y in ys:
+            ax.plot(y, linewidth=0.5)
+
+    for name, plot in (("ax.plot per series", loop),
+                       ("lines",
+                        lambda ax: yap.lines(ax, ys, linewidths=0.5))):
+        fig, ax = yap.singleplot(pyplot=False)
+        start = time.perf_counter()
+        plot(ax)
+        build = time.perf_counter() - start
+        fig.canvas.draw()
+        _report(name,
+                build_seconds=build,
+                draw_seconds=_best_of(fig.canvas.draw, repeat=3))
+
+
+@_benchmark
+def bench_rectangles() -> None:
+    """rectangles() versus one rectangle() call per region for 20k regions."""
+    starts = np.sort(np.random.default_rng(0).uniform(0, 1e6, 20000))
+    coords = np.column_stack(
+        (starts, np.zeros_like(starts), starts + 10, np.ones_like(starts)))
+
+    def loop(ax):
+        for x1, y1, x2, y2 in coords:
+            yap.rectangle(ax, x1, y1, x2, y2, color="red", alpha=0.3)
+
+    for name, plot in (("rectangle per region", loop), (
+            "rectangles",
+            lambda ax: yap.rectangles(ax, coords, color="red", alpha=0.3))):
+        fig, ax = yap.singleplot(pyplot=False)
+        start = time.perf_counter()
+        plot(ax)
+        build = time.perf_counter() - start
+        fig.canvas.draw()
+        _report(name,
+                build_seconds=build,
+                draw_seconds=_best_of(fig.canvas.draw, repeat=3))
+
+
+@_benchmark
+def bench_styling_grid() -> None:
+    """Styling a 10x10 grid in one call versus one call per axes."""
+
+    def style(axes):
+        yap.despine(axes)
+        yap.ticklabelsize(axes, size=8)
+        yap.limits(axes, xlimits=(0, 10), ylimits=(0, 1))
+        yap.ticks_and_labels(axes, "x", [0, 5, 10])
+        yap.labels(axes, xlabel="x", ylabel="y")
+
+    def grid():
+        return yap.multiplot(10, 10, (20, 20), pyplot=False, sharex=True)[1]
+
+    def per_axes():
+        for axes in grid().flat:
+            style(axes)
+
+    def batched():
+        style(grid())
+
+    _report("multiplot only", seconds=_best_of(grid, repeat=3))
+    _report("styling per axes", seconds=_best_of(per_axes, repeat=3))
+    _report("styling whole grid", seconds=_best_of(batched, repeat=3))
+
+
+@_benchmark
+def bench_smallmultiples() -> None:
+    """smallmultiples() versus multiplot() for a 30x30 grid of lines."""
+    x = np.linspace(0, 10, 50)
+
+    def axes_grid():
+        fig, ax = yap.multiplot(30,
+                                30, (30, 30),
+                                pyplot=False,
+                                sharex=True,
+                                sharey=True)
+        for i, axis in enumerate(ax.flat):
+            axis.plot(x, np.sin(x + i))
+        yap.limits(ax, xlimits=(0, 10), ylimits=(-1, 1))
+        return fig
+
+    def panel_grid():
+        fig, _, panels = yap.smallmultiples(30,
+                                            30, (30, 30), (0, 10), (-1, 1),
+                                            pyplot=False)
+        for i, panel in enumerate(panels.flat):
+            panel.plot(x, np.sin(x + i))
+        return fig
+
+    for name, build in (("multiplot", axes_grid), ("smallmultiples",
+                                                   panel_grid)):
+        start = time.perf_counter()
+        fig = build()
+        seconds = time.perf_counter() - start
+        _report(name,
+                build_seconds=seconds,
+                draw_seconds=_best_of(fig.canvas.draw, repeat=1))
+
+
+@_benchmark
+def bench_ticklabel_properties() -> None:
+    """Panning a figure with rotated and aligned tick labels."""
+
+    def pan(restyle):
+        fig, ax = yap.singleplot(size=(6, 4), pyplot=False)
+        ax.plot(range(1000), range(1000))
+        yap.rotate_ticklabels(ax, which="x", rotation=45)
+        yap.align_ticklabels(ax, which="x", horizontal="right")
+        for start in range(0, 500, 10):
+            ax.set_xlim(start, start + 100)
+            restyle(ax)
+            fig.canvas.draw()
+
+    def fixed_labels(ax):
+        # Previous approach: labels fixed by set_xticklabels() are stale
+        # after each limit change, so they had to be set again
+        ax.set_xticks(ax.get_xticks())
+        ax.set_xticklabels(ax.get_xticklabels(),
+                           rotation=45,
+                           horizontalalignment="right")
+
+    _report("set_xticklabels per limit change",
+            seconds=_best_of(lambda: pan(fixed_labels), repeat=3))
+    _report("label properties",
+            seconds=_best_of(lambda: pan(lambda ax: None), repeat=3))
+
+
+@_benchmark
+def bench_ticks_and_labels_thin() -> None:
+    """ticks_and_labels() with and without thinning for 5000 categories."""
+    names = [f"category {i}" for i in range(5000)]
+    for thin in (False, True):
+        fig, ax = yap.singleplot(pyplot=False)
+        ax.plot(np.random.default_rng(0).uniform(size=len(names)))
+        yap.ticks_and_labels(ax,
+                             "x",
+                             list(range(len(names))),
+                             names,
+                             thin=thin)
+        yap.rotate_ticklabels(ax, which="x", rotation=90)
+
+        def export(fig=fig) -> None:
+            yap.to_bytes(fig=fig)
+
+        _report(f"thin={thin}",
+                png_seconds=_best_of(export, repeat=1),
+                labels=len(ax.get_xticks()))
+
+
+@_benchmark
+def bench_legend() -> None:
+    """legend() placement with loc="best" versus loc="fast"."""
+    x, y = np.random.default_rng(0).uniform(size=(2, 1_000_000))
+    for points in (100, len(x)):
+        for loc in (None, "best", "fast"):
+            fig, ax = yap.singleplot(pyplot=False)
+            ax.scatter(x[:points], y[:points], s=1, label="data")
+            if loc is not None:
+                yap.legend(ax, loc=loc, fontsize=12)
+            fig.canvas.draw()
+            handle = ax.get_legend()
+            _report(f"{points} points, loc={loc}",
+                    draw_seconds=_best_of(fig.canvas.draw, repeat=3),
+                    legend_x=float("nan")
+                    if handle is None else handle.get_window_extent().x0)
+
+
+def _small_chart() -> None:
+    ''' Builds a small chart, used as batch rendering task '''
+    _, ax = yap.singleplot(size=(3, 2))
+    ax.plot(range(100), range(100))
+    yap.despine(ax)
+    yap.ticklabelsize(ax, size=8)
+
+
+@_benchmark
+def bench_render_batch() -> None:
+    """render_batch() versus a sequential loop over the same tasks."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tasks = [(_small_chart, f"{tmp}/{i}.png") for i in range(64)]
+
+        def sequential():
+            for func, filename in tasks:
+                func()
+                yap.save_png(filename, dpi=100)
+                plt.close()
+
+        _report("sequential loop", seconds=_best_of(sequential, repeat=1))
+        _report("render_batch",
+                seconds=_best_of(lambda: yap.render_batch(tasks, dpi=100),
+                                 repeat=1))
+
+
+@_benchmark
+def bench_template() -> None:
+    """Template versus building and styling a new figure per chart,
+    exporting 30 charts as PNG files."""
+    rng = np.random.default_rng(0)
+    datasets = [
+        rng.standard_normal((3, 200)).cumsum(axis=1) for _ in range(30)
+    ]
+
+    def style(fig, ax):
+        yap.despine(ax)
+        yap.ticklabelsize(ax, size=12)
+        yap.labels(ax, "time", "value", fontsize=14)
+        return fig, ax
+
+    def plot(ax, data, i):
+        for j, series in enumerate(data):
+            ax.plot(series, label=f"series {j}")
+        yap.title(ax, f"chart {i}", fontsize=14)
+
+    with tempfile.TemporaryDirectory() as tmp:
+
+        def fresh():
+            for i, data in enumerate(datasets):
+                fig, ax = style(*yap.singleplot(size=(6, 4), pyplot=False))
+                plot(ax, data, i)
+                yap.legend(ax, fontsize=10)
+                yap.save_png(f"{tmp}/{i}.png", dpi=100, fig=fig, close=True)
+
+        def templated():
+            template = yap.Template(
+                *style(*yap.singleplot(size=(6, 4), pyplot=False)),
+                legend_style={"fontsize": 10})
+            for i, data in enumerate(datasets):
+                with template.chart() as (fig, ax):
+                    plot(ax, data, i)
+                yap.save_png(f"{tmp}/{i}.png", dpi=100, fig=fig)
+            template.close()
+
+        variants = (("singleplot per chart", fresh), ("Template", templated))
+        for name, func in variants:
+            seconds = _best_of(func, repeat=3)
+            _report(name,
+                    seconds=seconds,
+                    charts_per_second=round(len(datasets) / seconds, 1))
+
+
+@_benchmark
+def bench_animation() -> None:
+    """Animation versus one singleplot() and export per frame."""
+    x = np.linspace(0, 10, 1000)
+    frames = 100
+
+    def style(ax):
+        yap.limits(ax, (0, 10), (-1.2, 1.2))
+        yap.despine(ax)
+        yap.labels(ax, "x", "y", fontsize=12)
+
+    with tempfile.TemporaryDirectory() as tmp:
+
+        def per_frame():
+            images = []
+            for i in range(frames):
+                fig, ax = yap.singleplot(size=(6, 4), pyplot=False)
+                ax.plot(x, np.sin(x + i / 10))
+                style(ax)
+                fig.canvas.draw()
+                images.append(
+                    PIL.Image.fromarray(
+                        np.asarray(
+                            fig.canvas.buffer_rgba())[..., :3]).quantize())
+            images[0].save(f"{tmp}/a.gif",
+                           save_all=True,
+                           append_images=images[1:],
+                           duration=50,
+                           loop=0)
+
+        def animation():
+            fig, ax = yap.singleplot(size=(6, 4), pyplot=False)
+            line, = ax.plot(x, np.sin(x))
+            style(ax)
+            with yap.Animation(f"{tmp}/b.gif", [line], fig=fig) as anim:
+                for i in range(frames):
+                    line.set_ydata(np.sin(x + i / 10))
+                    anim.frame()
+
+        for name, func in (("singleplot per frame", per_frame), ("Animation",
+                                                                 animation)):
+            _report(name, fps=frames / _best_of(func, repeat=1))
+
+
+@_benchmark
+def bench_liveplot() -> None:
+    """LivePlot versus a full redraw per sample of a streaming series."""
+    samples = 500
+
+    def styled():
+        fig, ax = yap.singleplot(size=(6, 4), pyplot=False)
+        yap.labels(ax, "time", "value", fontsize=12)
+        yap.ticklabelsize(ax, size=10)
+        return fig, ax
+
+    def full_redraw():
+        fig, ax = styled()
+        line, = ax.plot([], [])
+        xs, ys = [], []
+        for i in range(samples):
+            xs.append(i)
+            ys.append(np.sin(i / 20))
+            line.set_data(xs[-200:], ys[-200:])
+            ax.relim()
+            ax.autoscale_view()
+            fig.canvas.draw()
+
+    def live():
+        _, ax = styled()
+        plot = yap.LivePlot(ax, capacity=200)
+        for i in range(samples):
+            plot.append(i, np.sin(i / 20))
+            plot.update()
+
+    for name, func in (("canvas.draw per sample", full_redraw), ("LivePlot",
+                                                                 live)):
+        _report(name, updates_per_second=samples / _best_of(func, repeat=1))
+
+
+def main(argv: List[str]) -> None:
+    """Runs the benchmarks given by name, or all of them."""
+    for name in argv or list(BENCHMARKS):
+        if name not in BENCHMARKS:
+            raise ValueError(f"Unknown benchmark {name}.")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
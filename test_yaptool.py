@@ -1,11 +1,58 @@
 """Test suite for plottingtools.py"""
 
+import gc
+import re
+import shutil
+import subprocess
+import sys
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+
+import matplotlib.colors  # type: ignore
 import matplotlib.figure  # type: ignore
+import matplotlib.patches  # type: ignore
 import matplotlib.pyplot as plt  # type: ignore
+import matplotlib.ticker  # type: ignore
+import numpy as np
+import PIL.Image
 import pytest
 
 import yaptool as yap
 
+###########
+# Backend #
+###########
+
+
+def test_lazy_import():
+    """Test that importing yaptool and pinning a backend does not load pyplot."""
+    code = ("import sys, yaptool;"
+            "assert 'matplotlib' not in sys.modules;"
+            "yaptool.use_backend('Agg');"
+            "assert 'matplotlib.pyplot' not in sys.modules;"
+            "yaptool.singleplot(pyplot=False);"
+            "assert 'matplotlib.pyplot' not in sys.modules")
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+    # Resolved attributes and submodules are cached on the proxies
+    assert yap.np.asarray is np.asarray
+    assert "asarray" in vars(yap.np)
+    proxy = yap.matplotlib.figure
+    assert yap.matplotlib.figure is proxy
+    assert yap.matplotlib.figure.Figure is matplotlib.figure.Figure
+
+
+def test_lazy_import_pathological():
+    """Pathological test for attributes missing from lazily imported modules."""
+    code = ("import inspect, yaptool;"
+            "assert not hasattr(yaptool.np, '__wrapped__');"
+            "assert 'numpy' not in __import__('sys').modules;"
+            "assert not hasattr(yaptool.concurrent, 'no_such_module');"
+            "inspect.unwrap(yaptool.np)")
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
 ######################
 # General Aesthetics #
 ######################
@@ -23,6 +70,44 @@ def test_light_and_darkmode():
     yap.darkmode()
 
 
+#############
+# TeX cache #
+#############
+
+
+def test_tex_cache(tmp_path, monkeypatch):
+    """Test bounding the TeX cache and reporting its statistics."""
+    monkeypatch.setattr(yap.matplotlib, "get_cachedir", lambda: str(tmp_path))
+    (tmp_path / "tex.cache" / "ab").mkdir(parents=True)
+    for i in range(4):
+        (tmp_path / "tex.cache" / "ab" / f"{i}.dvi").write_bytes(b"x" * 100)
+    stats = yap.tex_cache_stats()
+    assert stats["files"] == 4 and stats["bytes"] == 400
+
+    yap.texon(cache_max_bytes=250)
+    yap.texoff()
+    stats = yap.tex_cache_stats()
+    assert stats["files"] == 2 and stats["bytes"] == 200
+    yap.tex_cache_prune(0)
+    assert yap.tex_cache_stats()["files"] == 0
+
+
+def test_tex_cache_pathological():
+    """Pathological test for bounding the TeX cache."""
+    with pytest.raises(ValueError):
+        yap.tex_cache_prune(-1)
+
+
+@pytest.mark.skipif(shutil.which("latex") is None, reason="needs LaTeX")
+def test_tex_prewarm():
+    """Test rendering texts into the TeX cache ahead of time."""
+    yap.texon()
+    yap.tex_prewarm(["$x$", "$f(x)$"], fontsize=12)
+    yap.tex_prewarm(["$x$"], fontsize=12)
+    yap.texoff()
+    assert yap.tex_cache_stats()["hits"] >= 1
+
+
 ####################
 # Types of layouts #
 ####################
@@ -45,6 +130,157 @@ def test_multiplot():
     plt.close()
 
 
+def test_layouts_without_pyplot():
+    """Test making new figures which are not registered with pyplot."""
+    fignums = plt.get_fignums()
+    fig, ax = yap.singleplot(size=(7, 5), pyplot=False)
+    assert isinstance(fig, matplotlib.figure.Figure)
+    assert ax.figure is fig
+    fig, ax = yap.multiplot(nrows=2,
+                            ncols=3,
+                            size_xy=(6, 4),
+                            hspace=1,
+                            wspace=1,
+                            pyplot=False)
+    assert ax.shape == (2, 3)
+    assert fig.subplotpars.hspace == 1
+    assert plt.get_fignums() == fignums
+
+
+def test_smallmultiples(tmp_path):
+    """Test making a new grid of small multiples."""
+    fignums = plt.get_fignums()
+    fig, ax, panels = yap.smallmultiples(3,
+                                         4, (8, 6),
+                                         xlimits=(0, 10),
+                                         ylimits=(-1, 1),
+                                         yticks=[-1, 0, 1, 5],
+                                         spacing=0.2,
+                                         pyplot=False)
+    assert panels.shape == (3, 4)
+    assert len(fig.axes) == 1
+    assert plt.get_fignums() == fignums
+
+    line, = panels[0, 1].plot([0, 10], [-1, 1])
+    points = line.get_transform().transform([[0, -1], [10, 1]])
+    expected = ax.transData.transform([[1.1, 2.1], [1.9, 2.9]])
+    assert np.allclose(points, expected)
+    assert panels[2, 0].scatter([5], [0]).get_clip_box() is not None
+    panels[1, 1].title("panel")
+    panels[1, 2].add_artist(matplotlib.patches.Rectangle((0, 0), 5, 1))
+
+    texts = [text.get_text() for text in ax.texts]
+    assert texts.count("5") == 4  # x tick labels along the bottom row
+    assert texts.count("-1") == 3  # y tick labels along the left column
+    assert "panel" in texts
+    yap.save_png(str(tmp_path / "fig.png"), dpi=50, fig=fig)
+
+
+def test_smallmultiples_pathological():
+    """Pathological test for making a new grid of small multiples."""
+    with pytest.raises(ValueError):
+        yap.smallmultiples(0, 4, (8, 6), (0, 1), (0, 1), pyplot=False)
+    with pytest.raises(ValueError):
+        yap.smallmultiples(3, 4, (8, 6), (1, 1), (0, 1), pyplot=False)
+    with pytest.raises(ValueError):
+        yap.smallmultiples(3,
+                           4, (8, 6), (0, 1), (0, 1),
+                           spacing=1,
+                           pyplot=False)
+
+
+###############
+# Figure pool #
+###############
+
+
+def test_figure_pool():
+    """Test handing out, recycling and evicting pooled figures."""
+    fignums = plt.get_fignums()
+    pool = yap.FigurePool(maxsize=2)
+    fig, ax = pool.singleplot(size=(4, 3))
+    ax.plot([1, 2, 3], [1, 2, 3])
+    yap.despine(ax)
+    yap.ticklabelsize(ax, size=5)
+    yap.align_ticklabels(ax, "y", horizontal="left", vertical="top")
+    fig.suptitle("title")
+    ax.set_axis_off()
+    ax.invert_yaxis()
+    ax.set_facecolor("red")
+    ax.tick_params(labelbottom=False, left=False, labelright=True)
+    pool.release(fig)
+    fig2, ax2 = pool.singleplot(size=(4, 3))
+    assert fig2 is fig and ax2 is ax
+    assert not ax.lines and not fig.texts
+    assert {(tick.label1.get_ha(), tick.label1.get_va())
+            for tick in ax.yaxis.majorTicks} == {("right", "center_baseline")}
+    assert ax.spines["top"].get_visible()
+    assert ax.axison and not ax.yaxis_inverted()
+    assert matplotlib.colors.same_color(ax.get_facecolor(),
+                                        matplotlib.rcParams["axes.facecolor"])
+    fresh = yap.singleplot(size=(4, 3), pyplot=False)[1]
+    for tick, fresh_tick in ((ax.xaxis.majorTicks[0],
+                              fresh.xaxis.majorTicks[0]),
+                             (ax.yaxis.majorTicks[0],
+                              fresh.yaxis.majorTicks[0])):
+        parts = ("tick1line", "tick2line", "label1", "label2")
+        assert [getattr(tick, part).get_visible() for part in parts] == [
+            getattr(fresh_tick, part).get_visible() for part in parts
+        ]
+    ax2.plot([10, 20], [30, 40])
+    assert ax2.get_xlim()[0] > 5 and ax2.get_ylim()[0] < ax2.get_ylim()[1]
+    assert pool.stats() == {
+        "allocated": 1,
+        "recycled": 1,
+        "evicted": 0,
+        "idle": 0
+    }
+
+    figs = [
+        pool.multiplot(2, 2, (4, 4), wspace=0.5)[0],
+        pool.multiplot(1, 2, (4, 2))[0],
+    ]
+    for pooled in [fig2] + figs:
+        pool.release(pooled)
+    assert pool.stats() == {
+        "allocated": 3,
+        "recycled": 1,
+        "evicted": 1,
+        "idle": 2
+    }
+    fig3, ax3 = pool.multiplot(2, 2, (4, 4), wspace=0.5)
+    assert fig3 is figs[0] and ax3.shape == (2, 2)
+    assert fig3.subplotpars.wspace == 0.5
+    assert plt.get_fignums() == fignums
+
+
+def test_figure_pool_pathological():
+    """Pathological test for pooled figures."""
+    with pytest.raises(ValueError):
+        yap.FigurePool(maxsize=0)
+    fig, _ = yap.singleplot(pyplot=False)
+    with pytest.raises(ValueError):
+        yap.FigurePool().release(fig)
+
+    # Figures closed on export are dropped instead of being recycled
+    pool = yap.FigurePool()
+    for build in (lambda: pool.singleplot(size=(2, 2)),
+                  lambda: pool.multiplot(1, 2, (4, 2))):
+        fig, _ = build()
+        yap.to_bytes("svg", fig=fig, close=True)
+        pool.release(fig)
+        fig2, ax2 = build()
+        assert fig2 is not fig
+        assert all(item.figure is fig2 for item in np.ravel(ax2))
+        pool.release(fig2)
+    assert pool.stats() == {
+        "allocated": 4,
+        "recycled": 0,
+        "evicted": 2,
+        "idle": 2
+    }
+
+
 #############################
 # Adding elements to a plot #
 #############################
@@ -58,6 +294,30 @@ def test_legend():
     plt.close()
 
 
+def test_legend_fast():
+    """Test placing a legend on an occupancy grid of the data."""
+    x, y = np.random.default_rng(0).uniform(size=(2, 200000))
+    free = (x < 0.5) & (y > 0.5)
+    fig, ax = yap.singleplot(pyplot=False)
+    ax.scatter(x[~free], y[~free], s=1, label="data")
+    yap.legend(ax, loc="fast", fontsize=12)
+    fig.canvas.draw()
+    box = ax.get_legend().get_window_extent().transformed(
+        ax.transAxes.inverted())
+    assert box.x1 < 0.5
+    assert box.y0 > 0.5
+
+    # Few data points fall back to the exact "best" location
+    extents = []
+    for loc in ("best", "fast"):
+        fig, ax = yap.singleplot(pyplot=False)
+        ax.plot(x[~free][:100], y[~free][:100], "o", label="data")
+        yap.legend(ax, loc=loc, fontsize=12)
+        fig.canvas.draw()
+        extents.append(ax.get_legend().get_window_extent().bounds)
+    assert extents[0] == extents[1]
+
+
 def test_legend_pathological():
     """Pathological tests for adding a legend."""
     with pytest.raises(ValueError):
@@ -151,6 +411,181 @@ def test_rectangle_pathological():
     plt.close()
 
 
+#################
+# Plotting data #
+#################
+
+
+def test_decimated_line():
+    """Test plotting a decimated line."""
+    _, ax = yap.singleplot(size=(4, 3), pyplot=False)
+    x = np.arange(100000.0)
+    y = np.sin(x / 100)
+    y[12345] = 5
+    line = yap.decimated_line(ax, x, y, buckets=100, color="C1")
+    assert len(line.get_xdata()) == 400
+    assert max(line.get_ydata()) == 5
+    assert ax.get_xlim()[0] < 0 < 99999 < ax.get_xlim()[1]
+
+    yap.limits(ax, xlimits=(1000, 1100))
+    assert len(line.get_xdata()) == 102
+    assert line.get_xdata()[0] == 999
+
+    _, ax = yap.singleplot(size=(4, 3), pyplot=False)
+    line = yap.decimated_line(ax, [1, 2, 3], [3, 2, 1])
+    assert list(line.get_ydata()) == [3, 2, 1]
+
+    # Removed lines are freed and their callbacks disconnected
+    callbacks = len(ax.callbacks.callbacks.get("xlim_changed", {}))
+    line = yap.decimated_line(ax, x, y)
+    line.remove()
+    yap.limits(ax, xlimits=(0, 10))
+    assert len(ax.callbacks.callbacks.get("xlim_changed", {})) == callbacks
+    line = yap.decimated_line(ax, x, y)
+    dead = weakref.ref(line)
+    line.remove()
+    del line
+    gc.collect()
+    assert dead() is None
+    assert len(ax.callbacks.callbacks.get("xlim_changed", {})) == callbacks
+
+
+def test_decimated_line_pathological():
+    """Pathological test for plotting a decimated line."""
+    with pytest.raises(ValueError):
+        yap.decimated_line("not an ax object", [1, 2], [1, 2])
+    _, ax = yap.singleplot(pyplot=False)
+    with pytest.raises(ValueError):
+        yap.decimated_line(ax, ["a", "b"], [1, 2])
+    with pytest.raises(ValueError):
+        yap.decimated_line(ax, [1, 2, 3], [1, 2])
+    with pytest.raises(ValueError):
+        yap.decimated_line(ax, [2, 1], [1, 2])
+    with pytest.raises(ValueError):
+        yap.decimated_line(ax, [1, 2], [1, 2], buckets=0)
+
+
+def test_density_scatter():
+    """Test plotting a scatter plot switching to a density image."""
+    _, ax = yap.singleplot(size=(4, 3), pyplot=False)
+    artist = yap.density_scatter(ax, [1, 2, 3], [1, 2, 3], color="C1")
+    assert len(artist.get_offsets()) == 3
+
+    rng = np.random.default_rng(0)
+    x, y = rng.standard_normal((2, 10000))
+    fig, ax = yap.singleplot(size=(4, 3), pyplot=False)
+    artist = yap.density_scatter(ax, x, y, threshold=1000, dpi=10)
+    bbox = ax.get_position()
+    assert artist.get_array().shape == (int(bbox.height * 30),
+                                        int(bbox.width * 40))
+    assert artist.get_array().sum() == 10000
+    fig.canvas.draw()
+
+    artist = yap.density_scatter(ax,
+                                 np.full(2000, 3.0),
+                                 y[:2000],
+                                 threshold=1000,
+                                 label="constant",
+                                 color="C1")
+    assert artist.get_label() == "constant"
+    xmin, xmax = artist.get_extent()[:2]
+    assert xmin < 3 < xmax
+
+
+def test_density_scatter_pathological():
+    """Pathological test for plotting a density scatter plot."""
+    with pytest.raises(ValueError):
+        yap.density_scatter("not an ax object", [1, 2], [1, 2])
+    _, ax = yap.singleplot(pyplot=False)
+    with pytest.raises(ValueError):
+        yap.density_scatter(ax, ["a", "b"], [1, 2])
+    with pytest.raises(ValueError):
+        yap.density_scatter(ax, [np.nan] * 10, [1] * 10, threshold=5)
+    with pytest.raises(ValueError):
+        yap.density_scatter(ax, [1, 2, 3], [1, 2])
+
+
+def test_lines():
+    """Test plotting many series as one artist."""
+    _, ax = yap.singleplot(pyplot=False)
+    collection = yap.lines(ax,
+                           np.ones((50, 10)),
+                           x=np.arange(10, 20),
+                           linewidths=np.linspace(1, 2, 50),
+                           label="group")
+    assert len(collection.get_segments()) == 50
+    assert len(collection.get_colors()) == 50
+    assert ax.get_xlim()[0] <= 10 and ax.get_xlim()[1] >= 19
+
+    collection = yap.lines(ax, [[1, 2, 3], [1, 2]],
+                           colors="red",
+                           alpha=[0.5, 1])
+    assert list(collection.get_colors()[:, 3]) == [0.5, 1]
+
+    yap.legend(ax)
+    assert [text.get_text()
+            for text in ax.get_legend().get_texts()] == ["group"]
+
+    # Groups continue the colour cycle of the axes, one colour per group
+    _, ax = yap.singleplot(pyplot=False)
+    first = yap.lines(ax, np.ones((3, 5)), label="first")
+    second = yap.lines(ax, np.zeros((3, 5)), label="second")
+    line, = ax.plot([1, 2])
+    cycle = matplotlib.rcParams["axes.prop_cycle"].by_key()["color"]
+    for collection, color in ((first, cycle[0]), (second, cycle[1])):
+        assert all(
+            matplotlib.colors.same_color(rgba, color)
+            for rgba in collection.get_colors())
+    assert matplotlib.colors.same_color(line.get_color(), cycle[2])
+    yap.legend(ax)
+    swatches = ax.get_legend().legend_handles[:2]
+    assert not matplotlib.colors.same_color(swatches[0].get_color(),
+                                            swatches[1].get_color())
+    unlabelled = yap.lines(ax, np.ones((2, 5)))
+    assert matplotlib.colors.same_color(unlabelled.get_colors(), cycle[3:5])
+
+
+def test_lines_pathological():
+    """Pathological test for plotting many series as one artist."""
+    with pytest.raises(ValueError):
+        yap.lines("not an ax object", np.ones((2, 2)))
+    _, ax = yap.singleplot(pyplot=False)
+    with pytest.raises(ValueError):
+        yap.lines(ax, [["a", "b"], ["c"]])
+    with pytest.raises(ValueError):
+        yap.lines(ax, [1, 2, 3])
+    with pytest.raises(ValueError):
+        yap.lines(ax, np.ones((2, 3)), x=[1, 2])
+    with pytest.raises(ValueError):
+        yap.lines(ax, [[1, 2, 3], [1, 2]], x=[1, 2])
+
+
+def test_rectangles():
+    """Test adding many rectangles at once."""
+    _, ax = yap.singleplot(pyplot=False)
+    collection = yap.rectangles(ax, [[1, 1, 2, 2], [3, 4, 5, 6]],
+                                linewidth=3,
+                                linestyle=":",
+                                color=["red", "blue"])
+    assert len(collection.get_paths()) == 2
+    assert collection.get_paths()[1].vertices[2].tolist() == [5, 6]
+    assert ax.get_xlim()[1] >= 5
+
+    collection = yap.rectangles(ax, np.zeros((0, 4)), fill=False, color="red")
+    assert not collection.get_facecolor().any()
+
+
+def test_rectangles_pathological():
+    """Pathological test for adding many rectangles at once."""
+    with pytest.raises(ValueError):
+        yap.rectangles("not an ax object", [[1, 1, 2, 2]])
+    _, ax = yap.singleplot(pyplot=False)
+    with pytest.raises(ValueError):
+        yap.rectangles(ax, [["a", 1, 2, 2]])
+    with pytest.raises(ValueError):
+        yap.rectangles(ax, [[1, 1, 2]])
+
+
 #############################
 # Change elements of a plot #
 #############################
@@ -237,6 +672,40 @@ def test_ticks_and_labels_pathological():
                              ticks=[-0.14, 1, 2],
                              ticklabels=None)
 
+    _, ax = yap.singleplot(pyplot=False)
+    with pytest.raises(ValueError):
+        yap.ticks_and_labels(ax,
+                             which="x",
+                             ticks=[1, 2],
+                             ticklabels=["a"],
+                             thin=True)
+
+
+def test_ticks_and_labels_thin():
+    """Test thinning out the ticks of an axis with very many categories."""
+    fig, ax = yap.singleplot(size=(6, 4), pyplot=False)
+    names = [f"category {i}" for i in range(5000)]
+    yap.ticks_and_labels(ax,
+                         "x",
+                         list(range(5000))[::-1],
+                         names[::-1],
+                         thin=True)
+    yap.limits(ax, xlimits=(0, 4999))
+    fig.canvas.draw()
+    ticks = ax.get_xticks()
+    assert 1 < len(ticks) < 100
+    assert [label.get_text() for label in ax.get_xticklabels()
+            ] == [names[int(tick)] for tick in ticks]
+    assert ax.xaxis.get_major_locator()() is ax.xaxis.get_major_locator()()
+
+    yap.rotate_ticklabels(ax, which="x", rotation=90)
+    fig.canvas.draw()
+    assert len(ax.get_xticks()) > len(ticks)
+
+    yap.limits(ax, xlimits=(100, 120))
+    fig.canvas.draw()
+    assert ax.get_xticks().tolist() == list(range(100, 121))
+
 
 @pytest.mark.filterwarnings('ignore::UserWarning')
 def test_rotate_ticklabels():
@@ -273,6 +742,27 @@ def test_align_ticklabels():
     plt.close()
 
 
+def test_ticklabel_properties_after_limits():
+    """Test that tick label rotation and alignment survive new limits."""
+    fig, ax = yap.singleplot(pyplot=False)
+    yap.rotate_ticklabels(ax, which="both", rotation=45)
+    yap.align_ticklabels(ax, which="x", horizontal="right", vertical="top")
+    yap.limits(ax, xlimits=(0, 1000), ylimits=(-5, 5))
+    fig.canvas.draw()
+    ticks = ax.xaxis.get_major_ticks()
+    assert ax.get_xticks()[-1] == 1000
+    assert {tick.label1.get_text() for tick in ticks} >= {"0", "1000"}
+    assert {(tick.label1.get_rotation(), tick.label1.get_ha(),
+             tick.label1.get_va())
+            for tick in ticks} == {(45, "right", "top")}
+    assert {(tick.label2.get_ha(), tick.label2.get_va())
+            for tick in ticks} == {("right", "top")}
+    assert {tick.label1.get_rotation()
+            for tick in ax.yaxis.get_major_ticks()} == {45}
+    assert not isinstance(ax.xaxis.get_major_locator(),
+                          matplotlib.ticker.FixedLocator)
+
+
 @pytest.mark.filterwarnings('ignore::UserWarning')
 def test_align_ticklabels_pathological():
     """Pathological test for setting tick label alignments."""
@@ -289,3 +779,562 @@ def test_align_ticklabels_pathological():
                              which="x",
                              horizontal=None,
                              vertical="center")
+
+
+def test_styling_grid():
+    """Test styling a whole grid of plots in one call."""
+    _, ax = yap.multiplot(2,
+                          3, (6, 4),
+                          pyplot=False,
+                          sharex=True,
+                          sharey="row")
+    yap.despine(ax)
+    yap.ticklabelsize(ax, size=5)
+    yap.limits(ax, xlimits=(0, 5), ylimits=(1, 2))
+    yap.ticks_and_labels(ax, "x", [1, 2], ["a", "b"])
+    yap.labels(ax, xlabel="x", ylabel="y", outer=True)
+    yap.title(list(ax[0]), "top")
+    for axis in ax.flat:
+        assert not axis.spines["top"].get_visible()
+        assert axis.get_xlim() == (0, 5)
+        assert axis.get_ylim() == (1, 2)
+        assert axis.get_xticks().tolist() == [1, 2]
+        assert axis.xaxis.get_major_ticks()[0].label1.get_fontsize() == 5
+    assert [axis.get_xlabel()
+            for axis in ax.flat] == ["", "", "", "x", "x", "x"]
+    assert [axis.get_ylabel()
+            for axis in ax.flat] == ["y", "", "", "y", "", ""]
+    assert [axis.get_title() for axis in ax.flat] == ["top"] * 3 + [""] * 3
+
+
+def test_styling_grid_pathological():
+    """Pathological test for styling a whole grid of plots in one call."""
+    _, ax = yap.multiplot(2, 2, (4, 4), pyplot=False)
+    with pytest.raises(ValueError):
+        yap.despine([ax[0, 0], "not an ax object"])
+    with pytest.raises(ValueError):
+        yap.limits([], xlimits=(0, 1))
+    with pytest.raises(ValueError):
+        yap.ticklabelsize(ax, which="z")
+
+
+##################
+# Export figures #
+##################
+
+
+def test_save_tight_layout(tmp_path):
+    """Test exporting figures cropped to their tight bounding box."""
+    fig, ax = yap.singleplot(size=(3, 2), pyplot=False)
+    ax.plot([1, 2, 3], [1, 2, 3])
+    yap.labels(ax, "x", "y")
+    yap.save_png(str(tmp_path / "fast.png"), dpi=100, fig=fig)
+    fig.savefig(tmp_path / "tight.png", dpi=100, bbox_inches="tight")
+    with PIL.Image.open(tmp_path / "fast.png") as fast, PIL.Image.open(
+            tmp_path / "tight.png") as tight:
+        assert abs(fast.size[0] - tight.size[0]) <= 1
+        assert abs(fast.size[1] - tight.size[1]) <= 1
+        width = fast.size[0]
+
+    # Content outside of the canvas is not cropped away
+    fig.text(1.2, 0.5, "outside")
+    yap.save_png(str(tmp_path / "outside.png"), dpi=100, fig=fig)
+    with PIL.Image.open(tmp_path / "outside.png") as outside:
+        assert outside.size[0] > width + 20
+
+    # Figures of the same layout and size reuse the first bounding box
+    sizes = []
+    for ylabel in ("y", "a much longer label\nspanning two lines"):
+        fig, ax = yap.singleplot(size=(3, 2), pyplot=False)
+        ax.plot([1, 2, 3], [1, 2, 3])
+        yap.labels(ax, "x", ylabel)
+        yap.save_png(str(tmp_path / "layout.png"),
+                     dpi=100,
+                     fig=fig,
+                     layout="test_save_tight_layout")
+        yap.save_svg(str(tmp_path / "layout.svg"),
+                     fig=fig,
+                     layout="test_save_tight_layout")
+        with PIL.Image.open(tmp_path / "layout.png") as image:
+            sizes.append(image.size)
+    assert sizes[0] == sizes[1]
+
+
+def test_save_tight_layout_pathological(tmp_path):
+    """Pathological test for exporting figures with a layout cache."""
+    fig, _ = yap.singleplot(pyplot=False)
+    with pytest.raises(ValueError):
+        yap.save_png(str(tmp_path / "fig.png"), fig=fig, layout=["unhashable"])
+    with pytest.raises(ValueError):
+        yap.save_pdf(str(tmp_path / "fig.pdf"), fig=fig, layout={})
+
+
+def test_save_formats(tmp_path):
+    """Test exporting to several formats at once."""
+    _, ax = yap.singleplot()
+    ax.plot([1, 2, 3], [1, 2, 3])
+    yap.save_formats(str(tmp_path / "fig"), formats=("png", "svg", "pdf"))
+    for fmt in ("png", "svg", "pdf"):
+        assert (tmp_path / f"fig.{fmt}").stat().st_size > 0
+    plt.close()
+
+
+def test_save_formats_pathological(tmp_path):
+    """Pathological test for exporting to several formats at once."""
+    _, _ = yap.singleplot()
+    with pytest.raises(ValueError):
+        yap.save_formats(str(tmp_path / "fig"), formats=("png", "bmp"))
+    with pytest.raises(ValueError):
+        yap.save_formats(str(tmp_path / "fig"), formats=())
+    plt.close()
+
+
+def test_save_svg_compact(tmp_path):
+    """Test exporting size-optimized SVG files."""
+    fig, ax = yap.singleplot(size=(3, 2), pyplot=False)
+    x, y = np.random.default_rng(0).random((2, 500))
+    ax.scatter(x, y, s=2, alpha=0.35)
+    ax.set_xlabel("x 1.23456")
+    yap.save_svg(str(tmp_path / "full.svg"), fig=fig)
+    yap.save_svg_compact(str(tmp_path / "compact.svg"), fig=fig)
+    yap.save_svg_compact(str(tmp_path / "text.svg"),
+                         precision=0,
+                         keep_text=True,
+                         fig=fig)
+    full = (tmp_path / "full.svg").stat().st_size
+    assert (tmp_path / "compact.svg").stat().st_size < 0.8 * full
+    for name in ("compact.svg", "text.svg"):
+        root = ElementTree.parse(tmp_path / name).getroot()
+        assert root.tag == "{http://www.w3.org/2000/svg}svg"
+    text = (tmp_path / "text.svg").read_text(encoding="utf-8")
+    assert ">x 1.23456</text>" in text
+    assert ' d="' in text and "\n" not in text
+    assert not re.search(r' (x|y|d)="[^"]*\.', text)
+
+    # Glyph scales and opacities are not rounded, even at zero decimals
+    for name in ("compact.svg", "text.svg"):
+        svg = (tmp_path / name).read_text(encoding="utf-8")
+        assert "opacity:0.35" in svg
+    svg = (tmp_path / "compact.svg").read_text(encoding="utf-8")
+    original = (tmp_path / "full.svg").read_text(encoding="utf-8")
+    scales = set(re.findall(r"scale\([^)]*\)", svg))
+    assert "scale(0.015625)" in scales
+    assert scales == set(re.findall(r"scale\([^)]*\)", original))
+    yap.save_svg_compact(str(tmp_path / "zero.svg"), precision=0, fig=fig)
+    svg = (tmp_path / "zero.svg").read_text(encoding="utf-8")
+    assert set(re.findall(r"scale\([^)]*\)", svg)) == scales
+
+
+def test_save_svg_compact_pathological(tmp_path):
+    """Pathological test for exporting size-optimized SVG files."""
+    fig, _ = yap.singleplot(pyplot=False)
+    with pytest.raises(ValueError):
+        yap.save_svg_compact(str(tmp_path / "fig.svg"), precision=-1, fig=fig)
+    with pytest.raises(ValueError):
+        yap.save_svg_compact(str(tmp_path / "fig.svg"), precision=0.5, fig=fig)
+    with pytest.raises(ValueError):
+        yap.save_svg_compact(str(tmp_path / "fig.svg"), fig="not a figure")
+
+    # The global font type is restored, also after failing exports
+    fonttype = matplotlib.rcParams["svg.fonttype"]
+    yap.save_svg_compact(str(tmp_path / "fig.svg"), keep_text=True, fig=fig)
+    assert matplotlib.rcParams["svg.fonttype"] == fonttype
+    with pytest.raises(OSError):
+        yap.save_svg_compact(str(tmp_path / "missing" / "fig.svg"),
+                             keep_text=True,
+                             fig=fig)
+    assert matplotlib.rcParams["svg.fonttype"] == fonttype
+
+
+def _batch_plot():
+    """Module level plotting callable for the batch rendering tests."""
+    _, ax = yap.singleplot(size=(2, 2))
+    ax.plot([1, 2, 3], [1, 2, 3])
+    yap.despine(ax)
+
+
+def _batch_plot_unmanaged():
+    """Module level plotting callable returning a figure unknown to pyplot."""
+    fig, ax = yap.singleplot(size=(2, 2), pyplot=False)
+    ax.plot([1, 2, 3], [1, 2, 3])
+    return fig, ax
+
+
+def _batch_plot_empty():
+    """Module level plotting callable creating no figure."""
+
+
+def _batch_plot_failing():
+    """Module level plotting callable raising an error."""
+    raise RuntimeError("broken plot")
+
+
+def test_pdf_report(tmp_path):
+    """Test writing figures as pages of one PDF report."""
+    with yap.PdfReport(str(tmp_path / "report.pdf"),
+                       metadata={"Title": "Report"}) as report:
+        for i in range(3):
+            _, ax = yap.singleplot(size=(2, 2 + i))
+            ax.plot([1, 2, 3], [1, 2, i])
+            yap.labels(ax, "x", "y")
+            report.add(layout=("test_pdf_report", i))
+            assert not plt.get_fignums()
+        fig, _ = yap.singleplot(pyplot=False)
+        with yap.PdfReport(str(tmp_path / "keep.pdf"), close=False) as keep:
+            keep.add(fig)
+        assert fig.axes
+    assert report.pages == 3
+    data = (tmp_path / "report.pdf").read_bytes()
+    assert len(re.findall(rb"/Type /Page\b(?!s)", data)) == 3
+    assert len(re.findall(rb"/Type /Font\b", data)) == 1
+    assert b"/Title (Report)" in data
+
+
+def test_pdf_report_pathological(tmp_path):
+    """Pathological test for writing figures as pages of one PDF report."""
+    with yap.PdfReport(str(tmp_path / "report.pdf")) as report:
+        with pytest.raises(ValueError):
+            report.add("not a figure")
+        fig, _ = yap.singleplot(pyplot=False)
+        with pytest.raises(ValueError):
+            report.add(fig, layout={})
+    assert report.pages == 0
+
+
+def test_render_batch(tmp_path):
+    """Test rendering several figures in a process pool."""
+    tasks = [(_batch_plot, str(tmp_path / f"fig{i}.png")) for i in range(4)]
+    tasks.append((_batch_plot_failing, str(tmp_path / "broken.png")))
+    tasks.append((_batch_plot, str(tmp_path / "fig.bmp")))
+    errors = yap.render_batch(tasks, processes=2, chunksize=2)
+    assert errors[:4] == [None] * 4
+    assert "broken plot" in errors[4]
+    assert "ValueError" in errors[5]
+    for i in range(4):
+        assert (tmp_path / f"fig{i}.png").stat().st_size > 0
+    assert yap.render_batch([]) == []
+
+    # Figures returned by the callable are exported, also without pyplot
+    errors = yap.render_batch(
+        [(_batch_plot_unmanaged, str(tmp_path / "a.png")),
+         (_batch_plot_empty, str(tmp_path / "b.png"))],
+        processes=1,
+        dpi=50)
+    assert errors[0] is None
+    assert "no figure" in errors[1]
+    with PIL.Image.open(tmp_path / "a.png") as image:
+        assert len(image.getcolors(maxcolors=1 << 16)) > 1
+        assert image.size[0] < 200
+
+
+def test_render_batch_pathological():
+    """Pathological test for rendering several figures in a process pool."""
+    with pytest.raises(ValueError):
+        yap.render_batch([(_batch_plot, "fig.png")], processes=0)
+    with pytest.raises(ValueError):
+        yap.render_batch([(_batch_plot, "fig.png")], chunksize=0)
+
+
+def test_save_explicit_figure(tmp_path):
+    """Test exporting figures passed explicitly, from several threads."""
+
+    def render(i):
+        fig, ax = yap.singleplot(size=(2, 2), pyplot=False)
+        ax.plot([1, 2, 3], [i, i + 1, i + 2])
+        yap.save_png(str(tmp_path / f"{i}.png"), dpi=50, fig=fig)
+        yap.save_svg(str(tmp_path / f"{i}.svg"), fig=fig)
+        yap.save_pdf(str(tmp_path / f"{i}.pdf"), fig=fig)
+
+    fignums = plt.get_fignums()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(render, range(8)))
+    assert plt.get_fignums() == fignums
+    assert len(list(tmp_path.iterdir())) == 24
+
+
+def test_save_explicit_figure_pathological(tmp_path):
+    """Pathological test for exporting figures passed explicitly."""
+    with pytest.raises(ValueError):
+        yap.save_png(str(tmp_path / "fig.png"), fig="not a figure")
+
+
+def test_save_and_close(tmp_path):
+    """Test releasing figures after exporting them."""
+    fig, ax = yap.singleplot()
+    ax.plot([1, 2, 3], [1, 2, 3])
+    yap.save_png(str(tmp_path / "fig.png"), dpi=50, fig=fig, close=True)
+    assert fig.number not in plt.get_fignums()
+    assert not fig.axes
+
+    fig, ax = yap.singleplot(pyplot=False)
+    yap.save_formats(str(tmp_path / "fig"), fig=fig, close=True)
+    assert not fig.axes
+
+
+def test_to_bytes(tmp_path):
+    """Test exporting figures to bytes."""
+    fig, ax = yap.singleplot(size=(2, 2), pyplot=False)
+    ax.plot([1, 2, 3], [1, 2, 3])
+    content = yap.to_bytes("png", dpi=50, fig=fig)
+    assert content.startswith(b"\x89PNG")
+    yap.save_png(str(tmp_path / "fig.png"), dpi=50, fig=fig)
+    assert content == (tmp_path / "fig.png").read_bytes()
+    assert b"<svg" in yap.to_bytes("svg", fig=fig, layout="test_to_bytes")
+    assert yap.to_bytes("pdf", fig=fig, close=True).startswith(b"%PDF")
+
+
+def test_to_bytes_pathological():
+    """Pathological test for exporting figures to bytes."""
+    fig, _ = yap.singleplot(pyplot=False)
+    with pytest.raises(ValueError):
+        yap.to_bytes("bmp", fig=fig)
+    with pytest.raises(ValueError):
+        yap.to_bytes("png", fig=fig, layout=["unhashable"])
+
+
+def test_save_png_sizes(tmp_path):
+    """Test exporting PNG files of several sizes from one draw."""
+    fig, ax = yap.singleplot(size=(4, 3), pyplot=False)
+    ax.plot([1, 2, 3], [1, 2, 3])
+    yap.save_png_sizes(str(tmp_path / "fig"), dpis=(100, 50, 12.5), fig=fig)
+    sizes = []
+    for name in ("fig_100dpi.png", "fig_50dpi.png", "fig_12.5dpi.png"):
+        with PIL.Image.open(tmp_path / name) as image:
+            sizes.append(image.size)
+            assert round(image.info["dpi"][0],
+                         1) == float(name[4:].split("dpi", maxsplit=1)[0])
+    assert abs(sizes[0][0] / 2 - sizes[1][0]) <= 1
+    assert abs(sizes[0][1] / 8 - sizes[2][1]) <= 1
+
+    # Repeated DPIs are written once, and every size is downsampled
+    # directly from the full size image
+    yap.save_png_sizes(str(tmp_path / "dup"), dpis=(50, 100, 50), fig=fig)
+    assert sorted(path.name for path in tmp_path.glob("dup_*")) == [
+        "dup_100dpi.png", "dup_50dpi.png"
+    ]
+    with PIL.Image.open(tmp_path / "fig_100dpi.png") as full, PIL.Image.open(
+            tmp_path / "fig_12.5dpi.png") as small:
+        direct = full.resize(small.size,
+                             PIL.Image.Resampling.LANCZOS,
+                             reducing_gap=3.0)
+        assert np.array_equal(np.asarray(direct), np.asarray(small))
+
+
+def test_save_png_sizes_pathological(tmp_path):
+    """Pathological test for exporting PNG files of several sizes."""
+    fig, _ = yap.singleplot(pyplot=False)
+    with pytest.raises(ValueError):
+        yap.save_png_sizes(str(tmp_path / "fig"), dpis=(), fig=fig)
+    with pytest.raises(ValueError):
+        yap.save_png_sizes(str(tmp_path / "fig"), dpis=(300, 0), fig=fig)
+    with pytest.raises(ValueError):
+        yap.save_png_sizes(str(tmp_path / "fig"), fig="not a figure")
+
+
+def test_to_rgba():
+    """Test accessing the pixels of a figure without copying."""
+    fig, _ = yap.singleplot(size=(2, 1), pyplot=False)
+    fig.set_dpi(50)
+    pixels = yap.to_rgba(fig)
+    assert pixels.shape == (50, 100, 4)
+    assert pixels.dtype == "uint8"
+    assert not pixels.flags.owndata
+
+
+def test_to_rgba_pathological():
+    """Pathological test for accessing the pixels of a figure."""
+    fig = matplotlib.figure.Figure()
+    with pytest.raises(ValueError):
+        yap.to_rgba(fig)
+
+
+def test_async_exporter(tmp_path):
+    """Test exporting figures in the background."""
+    with yap.AsyncExporter(max_pending=2, workers=2) as exporter:
+        futures = []
+        for i in range(4):
+            fig, ax = yap.singleplot(size=(2, 2), pyplot=False)
+            ax.plot([1, 2, 3], [i, i, i])
+            futures.append(
+                exporter.save_png(str(tmp_path / f"{i}.png"),
+                                  dpi=50,
+                                  fig=fig,
+                                  close=True))
+    assert all(future.done() for future in futures)
+    with open(tmp_path / "0.png", "rb") as file:
+        assert file.read(4) == b"\x89PNG"
+
+    exporter = yap.AsyncExporter()
+    fig, _ = yap.singleplot(size=(2, 2), pyplot=False)
+    exporter.save_png(str(tmp_path / "missing" / "fig.png"), fig=fig)
+    with pytest.raises(FileNotFoundError):
+        exporter.flush()
+    exporter.flush()
+    exporter.close()
+
+
+def test_async_exporter_pathological():
+    """Pathological test for exporting figures in the background."""
+    with pytest.raises(ValueError):
+        yap.AsyncExporter(max_pending=0)
+    with pytest.raises(ValueError):
+        yap.AsyncExporter(workers=0)
+
+
+#############
+# Templates #
+#############
+
+
+def test_template():
+    """Test reusing a styled figure for several charts."""
+    fig, ax = yap.singleplot(size=(4, 3), pyplot=False)
+    yap.despine(ax)
+    yap.labels(ax, "x", "y", fontsize=12)
+    ax.axhline(0, color="k")
+    template = yap.Template(fig, ax, legend_style={"fontsize": 8})
+    for i in (2, 1):
+        with template.chart() as (chart_fig, chart_ax):
+            assert chart_fig is fig and chart_ax is ax
+            ax.plot(range(10), np.arange(10) * i, label=f"line {i}")
+            ax.scatter([0, 1], [-i, -i])
+            yap.labels(ax, ylabel=f"y {i}")
+        assert len(ax.lines) == 2 and len(ax.collections) == 1
+        assert matplotlib.colors.same_color(ax.lines[1].get_color(), "C0")
+        assert 9 * i < ax.get_ylim()[1] < 9 * i + 2
+        assert ax.get_ylim()[0] < -i
+        assert ax.get_ylabel() == f"y {i}"
+        assert ax.get_legend() is not None
+    assert not ax.spines["top"].get_visible()
+    assert ax.xaxis.label.get_fontsize() == 12
+
+    with template.chart():
+        pass
+    assert ax.get_ylabel() == "y"
+    assert len(ax.lines) == 1 and not ax.collections
+    assert ax.get_legend() is None
+    template.close()
+
+
+def test_template_pathological():
+    """Pathological test for reusing a styled figure for several charts."""
+    fig, ax = yap.singleplot(pyplot=False)
+    with pytest.raises(ValueError):
+        yap.Template("not a figure", ax)
+    with pytest.raises(ValueError):
+        yap.Template(fig, "not an ax object")
+    ax.set_xlim(0, 5)
+    template = yap.Template(fig, ax)
+    with template.chart():
+        ax.plot([10, 20], [10, 20])
+    assert ax.get_xlim() == (0, 5)
+
+
+##############
+# Animations #
+##############
+
+
+def test_animation(tmp_path):
+    """Test writing an animation frame by frame."""
+    fig, ax = yap.singleplot(size=(3, 2), pyplot=False)
+    x = np.linspace(0, 10, 100)
+    line, = ax.plot(x, np.sin(x))
+    yap.limits(ax, (0, 10), (-1, 1))
+    with yap.Animation(str(tmp_path / "anim.gif"), [line], fig=fig,
+                       fps=10) as animation:
+        for i in range(5):
+            line.set_ydata(np.sin(x + i))
+            animation.frame()
+        yap.limits(ax, (0, 20), (-1, 1))
+        animation.refresh()
+        animation.frame()
+    assert not line.get_animated()
+    with PIL.Image.open(tmp_path / "anim.gif") as image:
+        assert image.n_frames == 6
+        assert image.size == (300, 200)
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None,
+                    reason="ffmpeg is not installed")
+def test_animation_mp4(tmp_path):
+    """Test streaming an animation to ffmpeg."""
+    fig, ax = yap.singleplot(size=(3, 2), pyplot=False)
+    line, = ax.plot([0, 1], [0, 1])
+    with yap.Animation(str(tmp_path / "anim.mp4"), [line], fig=fig,
+                       dpi=101) as animation:
+        for i in range(5):
+            line.set_ydata([0, i / 5])
+            animation.frame()
+    assert (tmp_path / "anim.mp4").stat().st_size > 0
+
+
+def test_animation_pathological(tmp_path):
+    """Pathological test for writing an animation frame by frame."""
+    fig, ax = yap.singleplot(size=(3, 2), pyplot=False)
+    line, = ax.plot([0, 1], [0, 1])
+    with pytest.raises(ValueError):
+        yap.Animation(str(tmp_path / "anim.avi"), [line], fig=fig)
+    with pytest.raises(ValueError):
+        yap.Animation(str(tmp_path / "anim.gif"), [line], fig=fig, fps=0)
+    with pytest.raises(ValueError):
+        yap.Animation(str(tmp_path / "anim.gif"), [line], fig="no figure")
+
+
+def test_liveplot():
+    """Test updating a plot of streaming data."""
+    fig, ax = yap.singleplot(size=(3, 2), pyplot=False)
+    live = yap.LivePlot(ax, series=2, capacity=10)
+    for i in range(25):
+        live.append(i, i**2, -i)
+        live.update()
+    live.append([25, 26], [625, 676], -26)
+    live.update()
+    xdata, ydata = live.lines[0].get_data()
+    assert xdata.tolist() == list(range(17, 27))
+    assert ydata.tolist() == [i**2 for i in range(17, 27)]
+    assert live.lines[1].get_ydata()[-1] == -26
+    assert ax.get_xlim()[0] <= 17
+    assert ax.get_xlim()[1] >= 26
+    assert ax.get_ylim()[0] <= -26
+    assert ax.get_ylim()[1] >= 676
+    assert live.stats()["updates"] == 26
+    assert 1 <= live.stats()["redraws"] < 26
+    assert np.asarray(fig.canvas.buffer_rgba()).shape == (200, 300, 4)
+
+
+def test_liveplot_pathological():
+    """Pathological test for updating a plot of streaming data."""
+    with pytest.raises(ValueError):
+        yap.LivePlot("not an ax object")
+    _, ax = yap.singleplot(pyplot=False)
+    with pytest.raises(ValueError):
+        yap.LivePlot(ax, capacity=0)
+    live = yap.LivePlot(ax, series=2)
+    with pytest.raises(ValueError):
+        live.append(1, 2)
+
+
+##########
+# Memory #
+##########
+
+
+def test_memory_usage(tmp_path):
+    """Test reporting open figures and the memory held by them."""
+    gc.collect()
+    before = yap.memory_usage()
+    fig, ax = yap.singleplot(size=(2, 2), pyplot=False)
+    ax.plot(range(1000), range(1000))
+    fig.canvas.draw()
+    usage = yap.memory_usage()
+    assert usage["open_figures"] == before["open_figures"] + 1
+    assert usage["bytes"] >= before["bytes"] + 16000 + 200 * 200 * 4
+    yap.save_svg(str(tmp_path / "fig.svg"), fig=fig, close=True)
+    assert yap.memory_usage() == before
+
+    # Figures closed by pyplot are not reported, even while referenced
+    fig, _ = yap.singleplot(size=(2, 2))
+    assert yap.memory_usage()["open_figures"] == before["open_figures"] + 1
+    plt.close(fig)
+    assert yap.memory_usage() == before
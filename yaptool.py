@@ -1,26 +1,127 @@
 """A collection of handy functions to avoid boilerplate code while using matplotlib."""
 
-__version__ = "0.1"
+from __future__ import annotations
 
-from typing import List, Literal, Optional, Tuple, Union
+__version__ = "0.1"
 
-import matplotlib  # type: ignore
-import matplotlib.figure  # type: ignore
-import matplotlib.pyplot as plt  # type: ignore
-from matplotlib import rc  # type: ignore
-from matplotlib.patches import Rectangle  # type: ignore
+import importlib
+import io
+import os
+import re
+import threading
+import weakref
+from collections import Counter, OrderedDict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from types import ModuleType
+from typing import (TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterator,
+                    List, Literal, Optional, Sequence, Set, Tuple, Union)
 
 ####################
 # Internal helpers #
 ####################
 
+
+class _LazyModule:  # pylint: disable=too-few-public-methods
+    ''' Internal helper deferring the import of a module until one of its
+    attributes is accessed. Unknown attributes are imported as submodules.
+    Resolved attributes are cached on the proxy, so later accesses cost no
+    more than a plain attribute lookup, i.e. like names bound by a
+    from-import, they do not follow later rebinding on the module. '''
+
+    def __init__(self, name: str, module: Optional[ModuleType] = None):
+        self._name = name
+        self._module = module
+
+    def __getattr__(self, attr: str) -> Any:
+        # Introspection, e.g. by inspect.unwrap() or doctest, probes for
+        # dunder attributes, which are never submodules
+        if attr.startswith("__") and attr.endswith("__"):
+            raise AttributeError(attr)
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        try:
+            value = getattr(module, attr)
+        except AttributeError:
+            try:
+                importlib.import_module(f"{self._name}.{attr}")
+            except ModuleNotFoundError as ex:
+                raise AttributeError(
+                    f"module '{self._name}' has no attribute '{attr}'") from ex
+            value = getattr(module, attr)
+        if isinstance(value, ModuleType):
+            value = _LazyModule(value.__name__, value)
+        setattr(self, attr, value)
+        return value
+
+
+if TYPE_CHECKING:
+    import concurrent.futures
+    import multiprocessing
+    import shutil
+    import subprocess
+    import traceback
+
+    import matplotlib  # type: ignore
+    import matplotlib.backends.backend_agg  # type: ignore
+    import matplotlib.backends.backend_pdf  # type: ignore
+    import matplotlib.collections  # type: ignore
+    import matplotlib.colors  # type: ignore
+    import matplotlib.figure  # type: ignore
+    import matplotlib.font_manager  # type: ignore
+    import matplotlib.image  # type: ignore
+    import matplotlib.lines  # type: ignore
+    import matplotlib.markers  # type: ignore
+    import matplotlib.patches  # type: ignore
+    import matplotlib.pyplot as plt  # type: ignore
+    import matplotlib.texmanager  # type: ignore
+    import matplotlib.ticker  # type: ignore
+    import matplotlib.transforms  # type: ignore
+    import numpy as np
+    import PIL.Image
+    from matplotlib.transforms import Bbox  # type: ignore
+    from numpy.typing import ArrayLike
+else:
+    concurrent = _LazyModule("concurrent")
+    multiprocessing = _LazyModule("multiprocessing")
+    shutil = _LazyModule("shutil")
+    subprocess = _LazyModule("subprocess")
+    traceback = _LazyModule("traceback")
+    matplotlib = _LazyModule("matplotlib")
+    plt = _LazyModule("matplotlib.pyplot")
+    np = _LazyModule("numpy")
+    PIL = _LazyModule("PIL")
+
 SPINES = Tuple[Union[Literal["top"], Literal["bottom"], Literal["left"],
                      Literal["right"]], ...]
 
+AxesLike = Union["plt.Axes", Sequence["plt.Axes"], "np.ndarray"]
+
+FORMATS = ("png", "svg", "pdf")
+
+LAYOUT_CACHE_SIZE = 128
+
+_RENDER_MARGIN = 0.5
+
+_TEX_STATS = {"hits": 0, "misses": 0, "evicted": 0}
+
+# Open figures, mapped to whether they are registered with pyplot
+_FIGURES: weakref.WeakKeyDictionary[matplotlib.figure.Figure,
+                                    bool] = weakref.WeakKeyDictionary()
+
+_LAYOUTS: OrderedDict[Tuple[Hashable, Tuple[float, ...]], Bbox] = OrderedDict()
+
+_DECIMATED: weakref.WeakKeyDictionary[matplotlib.lines.Line2D, Tuple[
+    np.ndarray, np.ndarray]] = weakref.WeakKeyDictionary()
+
+_OCCUPANCY: weakref.WeakKeyDictionary[plt.Axes, Tuple[Tuple[
+    Any, ...], np.ndarray]] = weakref.WeakKeyDictionary()
+
 
 def _set_fgbg(fg_col: str, bg_col: str):
     ''' Internal helper to change fore- and background colours '''
-    plt.rcParams.update({
+    matplotlib.rcParams.update({
         "lines.color": fg_col,
         "patch.edgecolor": fg_col,
         "text.color": fg_col,
@@ -37,6 +138,616 @@ def _set_fgbg(fg_col: str, bg_col: str):
     })
 
 
+def _tex_cache_files() -> List[Path]:
+    ''' Internal helper listing the files in matplotlib's TeX cache '''
+    cachedir = Path(matplotlib.get_cachedir(), "tex.cache")
+    return [path for path in cachedir.rglob("*") if path.is_file()]
+
+
+def _decimate(x: np.ndarray, y: np.ndarray, xmin: float, xmax: float,
+              buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    ''' Internal helper reducing sorted line data within [xmin, xmax] to the
+    first, minimal, maximal and last point of each of the given number of
+    equally wide buckets, which preserves the extrema of every bucket '''
+    start, stop = np.searchsorted(x, [xmin, xmax])
+    x = x[max(start - 1, 0):stop + 1]
+    y = y[max(start - 1, 0):stop + 1]
+    if len(x) <= 4 * buckets:
+        return x, y
+
+    edges = np.linspace(xmin, xmax, buckets + 1)[1:-1]
+    starts = np.unique(np.concatenate(([0], np.searchsorted(x, edges))))
+    starts = starts[starts < len(x)]
+    ends = np.append(starts[1:], len(x)) - 1
+    middle = (x[starts] + x[ends]) / 2
+    xs = np.column_stack((x[starts], middle, middle, x[ends]))
+    ys = np.column_stack((y[starts], np.fmin.reduceat(y, starts),
+                          np.fmax.reduceat(y, starts), y[ends]))
+    return xs.ravel(), ys.ravel()
+
+
+def _line_segments(ys: Any, x: Optional[ArrayLike]) -> Any:
+    ''' Internal helper converting series of y coordinates and optional shared
+    x coordinates into the segments of a LineCollection. Equally long series
+    are stacked into one array of shape (series, points, 2). '''
+    xdata = None if x is None else np.asarray(x, dtype=float)
+    try:
+        ydata = np.asarray(ys, dtype=float)
+    except ValueError:
+        ydata = None  # Series of different lengths
+
+    if ydata is not None and ydata.ndim == 2:
+        xgrid = np.arange(ydata.shape[1]) if xdata is None else xdata
+        if xgrid.shape != ydata.shape[1:]:
+            raise ValueError("Pass x with one value per point of each series.")
+        return np.stack(np.broadcast_arrays(xgrid, ydata), axis=-1)
+
+    series = [np.asarray(y, dtype=float) for y in ys]
+    if any(y.ndim != 1 for y in series):
+        raise ValueError("Pass ys as 2D array or sequence of 1D arrays.")
+    if xdata is not None and any(y.shape != xdata.shape for y in series):
+        raise ValueError("Pass x with one value per point of each series.")
+    return [
+        np.column_stack((np.arange(len(y)) if xdata is None else xdata, y))
+        for y in series
+    ]
+
+
+def _new_figure(size: Tuple[float, float],
+                pyplot: bool) -> matplotlib.figure.Figure:
+    ''' Internal helper to create a new figure, either registered with pyplot,
+    or standalone with its own Agg canvas '''
+    if pyplot:
+        fig = plt.figure(figsize=size)
+    else:
+        fig = matplotlib.figure.Figure(figsize=size)
+        matplotlib.backends.backend_agg.FigureCanvasAgg(fig)
+    _FIGURES[fig] = pyplot
+    return fig
+
+
+def _release_figure(fig: matplotlib.figure.Figure) -> None:
+    ''' Internal helper to close a figure, dropping its artists and the
+    cached renderer of its canvas, so the memory can be reclaimed '''
+    if fig.canvas.manager is not None:
+        plt.close(fig)
+    fig.clear()
+    vars(fig.canvas).pop("renderer", None)
+    vars(fig.canvas).pop("_lastKey", None)
+    _FIGURES.pop(fig, None)
+
+
+def _data_points(ax: plt.Axes) -> np.ndarray:
+    ''' Internal helper collecting the data points of lines and collections of
+    an axes in axes coordinates, i.e. the points which matplotlib avoids
+    when placing a legend at the "best" location '''
+    points = [np.empty((0, 2))]
+    for line in ax.lines:
+        points.append(line.get_transform().transform(line.get_xydata()))
+    for collection in ax.collections:
+        if isinstance(collection, (matplotlib.collections.PolyCollection,
+                                   matplotlib.collections.LineCollection)):
+            transform = collection.get_transform()
+            points.extend(
+                transform.transform(path.vertices)
+                for path in collection.get_paths())
+        elif len(offsets := np.asarray(collection.get_offsets())):
+            points.append(collection.get_offset_transform().transform(offsets))
+    return ax.transAxes.inverted().transform(np.concatenate(points))
+
+
+def _count_data_points(ax: plt.Axes) -> int:
+    ''' Internal helper counting the data points collected by _data_points(),
+    without transforming them '''
+    count = sum(len(np.asarray(line.get_xydata())) for line in ax.lines)
+    for collection in ax.collections:
+        if isinstance(collection, (matplotlib.collections.PolyCollection,
+                                   matplotlib.collections.LineCollection)):
+            count += sum(
+                len(np.asarray(path.vertices))
+                for path in collection.get_paths())
+        else:
+            count += len(np.asarray(collection.get_offsets()))
+    return count
+
+
+def _occupancy(ax: plt.Axes, bins: int = 64) -> np.ndarray:
+    ''' Internal helper returning the summed-area table of a grid counting the
+    data points per cell of an axes, which is cached until the limits, the
+    size or the artists of the axes change '''
+    key = (tuple(ax.viewLim.bounds), tuple(ax.bbox.bounds), len(ax.lines),
+           len(ax.collections))
+    if _OCCUPANCY.get(ax, (None, ))[0] != key:
+        points = _data_points(ax)
+        counts, _, _ = np.histogram2d(points[:, 0],
+                                      points[:, 1],
+                                      bins=bins,
+                                      range=[[0, 1], [0, 1]])
+        table = np.zeros((bins + 1, bins + 1))
+        table[1:, 1:] = counts.cumsum(axis=0).cumsum(axis=1)
+        _OCCUPANCY[ax] = (key, table)
+    return _OCCUPANCY[ax][1]
+
+
+def _fast_legend_loc(ax: plt.Axes, handle: Any) -> Any:
+    ''' Internal helper returning the legend location covering the fewest
+    data points, scored on an occupancy grid instead of on every vertex '''
+    table = _occupancy(ax)
+    bins = len(table) - 1
+    size = handle.get_window_extent().size / ax.bbox.size
+    pad = handle.borderaxespad * handle.prop.get_size_in_points(
+    ) * ax.figure.dpi / 72 / ax.bbox.size
+
+    # Same candidates and order as matplotlib's "best" location, given by
+    # the lower left corner at the left/bottom, center or right/top
+    names = ("upper right", "upper left", "lower left", "lower right", "right",
+             "center left", "center right", "lower center", "upper center",
+             "center")
+    sides = np.array([(2, 2), (0, 2), (0, 0), (2, 0), (2, 1), (0, 1), (2, 1),
+                      (1, 0), (1, 2), (1, 1)])
+    corners = np.array([pad, 0.5 - size / 2, 1 - pad - size])
+    lower = corners[sides, [0, 1]]
+    starts = np.clip(np.floor(lower * bins), 0, bins).astype(int)
+    ends = np.clip(np.ceil((lower + size) * bins), 0, bins).astype(int)
+    scores = (table[ends[:, 0], ends[:, 1]] - table[starts[:, 0], ends[:, 1]] -
+              table[ends[:, 0], starts[:, 1]] +
+              table[starts[:, 0], starts[:, 1]])
+    return names[int(np.argmin(scores))]
+
+
+def _figure_bytes(fig: matplotlib.figure.Figure) -> int:
+    ''' Internal helper estimating the memory held by a figure, i.e. its
+    cached pixel buffer and the data arrays of its artists '''
+    renderer = vars(fig.canvas).get("renderer")
+    nbytes = 0 if renderer is None else memoryview(
+        renderer.buffer_rgba()).nbytes
+    for ax in fig.axes:
+        arrays: List[Any] = [line.get_xydata() for line in ax.lines]
+        for collection in ax.collections:
+            arrays.append(collection.get_offsets())
+            arrays.extend(path.vertices for path in collection.get_paths())
+        arrays.extend(image.get_array() for image in ax.images)
+        nbytes += sum(np.asarray(array).nbytes for array in arrays)
+    return nbytes
+
+
+def _padded_range(data: np.ndarray) -> Tuple[float, float]:
+    ''' Internal helper returning the range of non-empty data, padded if the
+    data is constant, since a zero-width range would be invisible '''
+    low, high = float(data.min()), float(data.max())
+    if low == high:
+        pad = 0.05 * abs(low) or 0.5
+        return low - pad, high + pad
+    return low, high
+
+
+def _figure_or_current(
+        fig: Optional[matplotlib.figure.Figure]) -> matplotlib.figure.Figure:
+    ''' Internal helper returning fig, or pyplot's current figure if None '''
+    if fig is None:
+        return plt.gcf()
+    if not isinstance(fig, matplotlib.figure.Figure):
+        raise ValueError("Pass a valid figure in parameter fig.")
+    return fig
+
+
+def _plot_artists(fig: matplotlib.figure.Figure,
+                  axes: List[plt.Axes]) -> List[Any]:
+    ''' Internal helper listing the artists which have been added to a figure
+    and its axes, e.g. by plotting data, apart from legends '''
+    artists = [*fig.texts, *fig.lines, *fig.patches, *fig.images]
+    for ax in axes:
+        artists.extend([
+            *ax.lines, *ax.collections, *ax.patches, *ax.texts, *ax.images,
+            *ax.tables, *ax.artists
+        ])
+    return artists
+
+
+def _reset_figure(fig: matplotlib.figure.Figure, axes: List[plt.Axes]) -> None:
+    ''' Internal helper to restore a figure to the state of a freshly built
+    layout, keeping only the given axes. Unlike Axes.clear(), the existing
+    spines and ticks are kept, since they are expensive to rebuild. '''
+    for extra in [a for a in fig.axes if a not in axes]:
+        extra.remove()
+    for artist in [*fig.legends, *_plot_artists(fig, axes)]:
+        artist.remove()
+
+    for ax in axes:
+        if ax.legend_ is not None:
+            ax.legend_.remove()
+        for loc in ("left", "center", "right"):
+            ax.set_title("", loc=loc)
+        ax.set_prop_cycle(None)
+        ax.set_aspect("auto")
+        ax.grid(False)
+        ax.set_axis_on()
+        ax.set_facecolor(matplotlib.rcParams["axes.facecolor"])
+
+        for axis, name in ((ax.xaxis, "x"), (ax.yaxis, "y")):
+            if axis.get_scale() != "linear":
+                getattr(ax, f"set_{name}scale")("linear")
+            axis.set_inverted(False)
+            axis.set_label_text("")
+            axis.label.set_fontsize(matplotlib.rcParams["axes.labelsize"])
+            axis.labelpad = matplotlib.rcParams["axes.labelpad"]
+            axis.set_major_locator(matplotlib.ticker.AutoLocator())
+            axis.set_major_formatter(matplotlib.ticker.ScalarFormatter())
+            axis.set_minor_locator(matplotlib.ticker.NullLocator())
+            axis.set_minor_formatter(matplotlib.ticker.NullFormatter())
+
+        rcparams = matplotlib.rcParams
+        ax.tick_params(axis="x",
+                       labelsize=rcparams["xtick.labelsize"],
+                       labelrotation=0,
+                       bottom=rcparams["xtick.bottom"],
+                       top=rcparams["xtick.top"],
+                       labelbottom=rcparams["xtick.labelbottom"],
+                       labeltop=rcparams["xtick.labeltop"])
+        ax.tick_params(axis="y",
+                       labelsize=rcparams["ytick.labelsize"],
+                       labelrotation=0,
+                       left=rcparams["ytick.left"],
+                       right=rcparams["ytick.right"],
+                       labelleft=rcparams["ytick.labelleft"],
+                       labelright=rcparams["ytick.labelright"])
+        # The kept ticks keep any alignment set by align_ticklabels()
+        xalign = matplotlib.rcParams["xtick.alignment"]
+        for tick in ax.xaxis.majorTicks + ax.xaxis.minorTicks:
+            tick.label1.set(horizontalalignment=xalign,
+                            verticalalignment="top")
+            tick.label2.set(horizontalalignment=xalign,
+                            verticalalignment="bottom")
+        yalign = matplotlib.rcParams["ytick.alignment"]
+        for tick in ax.yaxis.majorTicks + ax.yaxis.minorTicks:
+            tick.label1.set(horizontalalignment="right",
+                            verticalalignment=yalign)
+            tick.label2.set(horizontalalignment="left",
+                            verticalalignment=yalign)
+        for spine in ax.spines.values():
+            spine.set_visible(True)
+        ax.relim()
+        ax.autoscale()
+
+
+def _flat_axes(ax: Any) -> List[plt.Axes]:
+    ''' Internal helper returning a single axes, or an array or sequence of
+    axes, as flat list, after checking once that all of them are valid '''
+    if hasattr(ax, 'plot'):
+        return [ax]
+    axes = list(np.ravel(np.asarray(ax, dtype=object)))
+    if not axes or not all(hasattr(item, 'plot') for item in axes):
+        raise ValueError("Pass a valid plot in parameter ax.")
+    return axes
+
+
+def _share_leaders(axes: List[plt.Axes], axis: str) -> List[plt.Axes]:
+    ''' Internal helper dropping all axes whose limits and ticks along the
+    given axis are shared with an earlier axes of the list, as setting them
+    on the earlier one already updates all of its siblings '''
+    leaders = []
+    covered: Set[plt.Axes] = set()
+    for ax in axes:
+        if ax not in covered:
+            leaders.append(ax)
+            group = getattr(ax, f"get_shared_{axis}_axes")()
+            covered.update(group.get_siblings(ax))
+    return leaders
+
+
+def _thinned_locator(ticks: np.ndarray, ticklabels: List[str],
+                     which: str) -> Any:
+    ''' Internal helper returning a tick locator, which only shows as many of
+    the given sorted ticks as fit next to each other without overlapping
+    labels. Label sizes are measured once per font, and the shown ticks are
+    only recomputed if the limits or the size of the axes have changed '''
+
+    class ThinnedLocator(matplotlib.ticker.Locator):
+        ''' Locator striding the given ticks to non-overlapping labels '''
+
+        def __init__(self):
+            self._sizes: Dict[int, np.ndarray] = {}
+            self._shown: Tuple[Any, np.ndarray] = (None, ticks[:0])
+
+        def _label_sizes(self, font: Any) -> np.ndarray:
+            ''' Returns width and height of all labels in points, adding up
+            the advances of their characters, which are measured only once '''
+            if hash(font) not in self._sizes:
+                face = matplotlib.font_manager.get_font(
+                    matplotlib.font_manager.findfont(font))
+                face.set_size(font.get_size_in_points(), 72)
+                advances = {
+                    char: face.load_char(ord(char)).linearHoriAdvance / 65536
+                    for char in set("".join(ticklabels))
+                }
+                face.set_text("".join(advances))
+                height = face.get_width_height()[1] / 64
+                self._sizes[hash(font)] = np.array([
+                    (sum(advances[char] for char in text), height)
+                    for text in ticklabels
+                ]).reshape(-1, 2)
+            return self._sizes[hash(font)]
+
+        def _step(self, axis: Any, label: Any, start: int, stop: int,
+                  length: float) -> int:
+            ''' Returns the stride between shown ticks, so that the labels
+            of the ticks between start and stop do not overlap '''
+            font = label.get_fontproperties()
+            width, height = self._label_sizes(font)[start:stop].T
+            if which == "y":
+                width, height = height, width
+            angle = np.deg2rad(label.get_rotation())
+            extent = np.abs(width * np.cos(angle)) + np.abs(
+                height * np.sin(angle))
+            vmin, vmax = axis.get_view_interval()
+            scaled = axis.get_transform().transform(
+                np.concatenate(([vmin, vmax], ticks[start:stop])))
+            distance = np.abs(np.diff(
+                scaled[2:])).min() * length / abs(scaled[1] - scaled[0])
+            return max(
+                int(
+                    np.ceil((extent.max() + font.get_size_in_points() / 2) /
+                            max(distance, 1e-9))), 1)
+
+        def tick_values(self, vmin: float, vmax: float) -> Any:
+            ''' Returns all given ticks between vmin and vmax '''
+            vmin, vmax = sorted((vmin, vmax))
+            return ticks[(ticks >= vmin) & (ticks <= vmax)]
+
+        def __call__(self) -> Any:
+            axis: Any = self.axis
+            vmin, vmax = sorted(axis.get_view_interval())
+            label = axis.majorTicks[0].label1
+            bbox = axis.axes.bbox
+            length = (bbox.width
+                      if which == "x" else bbox.height) * 72 / axis.figure.dpi
+            key = (vmin, vmax, length, label.get_rotation(),
+                   hash(label.get_fontproperties()))
+            if key != self._shown[0]:
+                start = np.searchsorted(ticks, vmin, side="left")
+                stop = np.searchsorted(ticks, vmax, side="right")
+                shown = ticks[start:stop]
+                if len(shown) > 1:
+                    # Strides are anchored to the tick index to avoid jitter
+                    step = self._step(axis, label, start, stop, length)
+                    shown = shown[np.arange(start, stop) % step == 0]
+                self._shown = (key, shown)
+            return self._shown[1]
+
+    return ThinnedLocator()
+
+
+def _layout_key(
+    fig: matplotlib.figure.Figure, layout: Optional[Hashable]
+) -> Optional[Tuple[Hashable, Tuple[float, ...]]]:
+    ''' Internal helper to build the layout cache key of a figure '''
+    if layout is None:
+        return None
+    if not isinstance(layout, Hashable):
+        raise ValueError("Parameter layout must be hashable.")
+    return (layout, tuple(fig.get_size_inches()))
+
+
+def _tight_bbox(fig: matplotlib.figure.Figure,
+                layout: Optional[Hashable] = None,
+                bbox: Optional[Bbox] = None) -> Bbox:
+    ''' Internal helper to compute the padded tight bounding box of a figure
+    in inches, using one layout pass without rendering, unless the bounding
+    box has already been measured while rendering. Figures of a given layout
+    and size share their bounding box via the layout cache '''
+    key = _layout_key(fig, layout)
+    if key is not None and key in _LAYOUTS:
+        _LAYOUTS.move_to_end(key)
+        return _LAYOUTS[key]
+
+    if bbox is None:
+        fig.draw_without_rendering()
+        bbox = fig.get_tightbbox()
+    pad = matplotlib.rcParams["savefig.pad_inches"]
+    bbox = bbox.padded(pad, pad)
+    if key is not None:
+        _LAYOUTS[key] = bbox
+        if len(_LAYOUTS) > LAYOUT_CACHE_SIZE:
+            _LAYOUTS.popitem(last=False)
+    return bbox
+
+
+def _render_bbox(fig: matplotlib.figure.Figure, dpi: float,
+                 bbox: Bbox) -> np.ndarray:
+    ''' Internal helper to render the given bounding box of a figure into a
+    new array of RGBA pixels of shape (height, width, 4) '''
+    # The raw buffer carries no shape, which is taken from the renderer
+    sizes: List[Tuple[float, float]] = []
+    callback = fig.canvas.mpl_connect(
+        "draw_event",
+        lambda event: sizes.append(event.renderer.get_canvas_width_height()))
+    try:
+        with io.BytesIO() as buffer:
+            fig.savefig(buffer, dpi=dpi, bbox_inches=bbox, format="rgba")
+            pixels = np.frombuffer(buffer.getvalue(), dtype=np.uint8)
+    finally:
+        fig.canvas.mpl_disconnect(callback)
+    width, height = sizes[-1]
+    return pixels.reshape(int(height), int(width), 4)
+
+
+def _render_cropped(
+        fig: matplotlib.figure.Figure, dpi: float,
+        layout: Optional[Hashable]) -> Tuple[Optional[np.ndarray], Bbox]:
+    ''' Internal helper to render a figure once, with a margin around its
+    canvas, and crop the pixels to its tight bounding box, measured from the
+    extents cached by that same draw. Returns the pixels, or None if the
+    figure has content beyond the margin, and the bounding box '''
+    margin = fig.bbox_inches.padded(_RENDER_MARGIN)
+    measured: List[Bbox] = []
+    callback = fig.canvas.mpl_connect(
+        "draw_event", lambda event: measured.append(
+            fig.get_tightbbox(event.renderer).frozen()))
+    try:
+        pixels = _render_bbox(fig, dpi, margin)
+    finally:
+        fig.canvas.mpl_disconnect(callback)
+
+    # The figure origin is moved to the corner of the margin while drawing
+    bbox = _tight_bbox(fig, layout,
+                       measured[-1].translated(margin.x0, margin.y0))
+    pad = matplotlib.rcParams["savefig.pad_inches"]
+    outer = margin.padded(pad)
+    if np.any(bbox.min < outer.min) or np.any(bbox.max > outer.max):
+        return None, bbox
+
+    x0 = round((bbox.x0 - margin.x0) * dpi)
+    y0 = round((margin.y1 - bbox.y1) * dpi)
+    cropped = np.empty((int(bbox.height * dpi), int(bbox.width * dpi), 4),
+                       dtype=np.uint8)
+    # Padding beyond the margin is filled with the figure background
+    cropped[...] = np.round(
+        np.multiply(matplotlib.colors.to_rgba(fig.get_facecolor()), 255))
+    rows = slice(max(y0, 0), min(y0 + cropped.shape[0], pixels.shape[0]))
+    cols = slice(max(x0, 0), min(x0 + cropped.shape[1], pixels.shape[1]))
+    cropped[rows.start - y0:rows.stop - y0,
+            cols.start - x0:cols.stop - x0] = pixels[rows, cols]
+    return cropped, bbox
+
+
+def _render_rgba(fig: matplotlib.figure.Figure,
+                 dpi: float,
+                 layout: Optional[Hashable] = None) -> np.ndarray:
+    ''' Internal helper to render the tight bounding box of a figure into a
+    new array of RGBA pixels of shape (height, width, 4), drawing the figure
+    only once unless it has content outside of its canvas '''
+    rcparams: Any = matplotlib.rcParams
+    cached = _layout_key(fig, layout) in _LAYOUTS
+    recoloured = rcparams["savefig.transparent"] or any(
+        rcparams[f"savefig.{key}"] != "auto"
+        for key in ("facecolor", "edgecolor"))
+    if cached or recoloured:
+        return _render_bbox(fig, dpi, _tight_bbox(fig, layout))
+
+    pixels, bbox = _render_cropped(fig, dpi, layout)
+    return _render_bbox(fig, dpi, bbox) if pixels is None else pixels
+
+
+def _write_png(pixels: np.ndarray, filename: Union[str, io.BytesIO],
+               dpi: float) -> None:
+    ''' Internal helper to encode RGBA pixels as PNG file or buffer '''
+    PIL.Image.fromarray(pixels).save(filename, format="png", dpi=(dpi, dpi))
+
+
+_SVG_NUMBER = re.compile(r"-?\d+\.\d+")
+
+_SVG_COORDINATES = re.compile(
+    r' (d|x|y|width|height)="([^"]*)"|translate\(([^)]*)\)')
+
+
+def _compact_svg(svg: str, precision: int) -> str:
+    ''' Internal helper to minify SVG markup, rounding coordinates, i.e. path
+    data, positions, sizes and translations, to the given number of decimals,
+    and replacing repeated inline styles by shared CSS classes. Scale factors
+    and style values such as opacities are kept exact, since rounding them
+    would distort glyphs and colours. '''
+
+    rounded: Dict[str, str] = {}
+
+    def number(match: re.Match) -> str:
+        if match[0] not in rounded:
+            text = f"{float(match[0]):.{precision}f}"
+            if "." in text:
+                text = text.rstrip("0").rstrip(".")
+            if text.startswith(("0.", "-0.")):
+                text = text.replace("0.", ".", 1)
+            rounded[match[0]] = "0" if text == "-0" else text
+        return rounded[match[0]]
+
+    def coordinates(match: re.Match) -> str:
+        if match[1] is None:
+            return f"translate({_SVG_NUMBER.sub(number, match[3])})"
+        value = _SVG_NUMBER.sub(number, match[2])
+        if match[1] == "d":
+            value = re.sub(r" ?([A-Za-z]) ?", r"\1", value.strip())
+            value = value.replace(" -", "-")
+        return f' {match[1]}="{value}"'
+
+    svg = re.sub(r"<!--.*?-->|<!DOCTYPE[^>]*>", "", svg, flags=re.DOTALL)
+    svg = re.sub(r">\s+<", "><", svg.strip())
+
+    # Odd parts are text content, which is kept as it is
+    parts = re.split(r"(>[^<]+<)", svg)
+    for i in range(0, len(parts), 2):
+        markup = _SVG_COORDINATES.sub(coordinates, " ".join(parts[i].split()))
+        parts[i] = re.sub(r"([:;]) ", r"\1", markup).replace(" />", "/>")
+
+    styles = Counter(style for markup in parts[::2]
+                     for style in re.findall(r' style="([^"]*)"', markup))
+    shared = [style for style, count in styles.items() if count > 1]
+    if shared and "</style>" in svg and ' class="' not in svg:
+        for i in range(0, len(parts), 2):
+            for index, style in enumerate(shared):
+                parts[i] = parts[i].replace(f' style="{style}"',
+                                            f' class="c{index}"')
+        css = "".join(f".c{index}{{{style}}}"
+                      for index, style in enumerate(shared))
+        return "".join(parts).replace("</style>", css + "</style>", 1)
+    return "".join(parts)
+
+
+def _init_worker() -> None:
+    ''' Internal helper to switch batch worker processes to a headless backend '''
+    use_backend("Agg")
+
+
+def _render_task(
+        task: Tuple[Callable[[], object], str, float]) -> Optional[str]:
+    ''' Internal helper to run one batch task and export its figure, i.e. the
+    figure returned by the callable, or else pyplot's current figure.
+    Returns None on success, and the formatted traceback on failure. '''
+    func, filename, dpi = task
+    try:
+        fmt = os.path.splitext(filename)[1].lstrip(".").lower()
+        if fmt not in FORMATS:
+            raise ValueError(
+                'Output filename must end in ".png", ".svg" or ".pdf".')
+        fig = func()
+        if isinstance(fig, tuple) and fig:
+            fig = fig[0]
+        if not isinstance(fig, matplotlib.figure.Figure):
+            if not plt.get_fignums():
+                raise ValueError("Task created no figure to export.")
+            fig = plt.gcf()
+        if fmt == "png":
+            save_png(filename, dpi=dpi, fig=fig, close=True)
+        elif fmt == "svg":
+            save_svg(filename, fig=fig, close=True)
+        else:
+            save_pdf(filename, fig=fig, close=True)
+        return None
+    except Exception:  # pylint: disable=broad-exception-caught
+        return traceback.format_exc()
+    finally:
+        plt.close("all")
+
+
+###########
+# Backend #
+###########
+
+
+def use_backend(name: str = "Agg") -> None:
+    """Pins the matplotlib backend. Importing yaptool does not load
+    matplotlib, so calling this before the first figure is created
+    selects e.g. a headless backend without ever loading a GUI toolkit.
+
+    Args:
+        name:
+            An optional string, specifying the backend, following
+            matplotlib's backend syntax. Defaults to "Agg", i.e. headless.
+
+    Returns:
+        None
+    """
+    matplotlib.use(name)
+
+
 ######################
 # General Aesthetics #
 ######################
@@ -78,18 +789,27 @@ def lightmode(foreground: str = "0", background: str = "1.0") -> None:
     _set_fgbg(fg_col=foreground, bg_col=background)
 
 
-def texon() -> None:
+def texon(cache_max_bytes: Optional[int] = None) -> None:
     """Switches on TeX-rendering of texts.
+    Rendered snippets are cached on disk by matplotlib, keyed by text,
+    font size and preamble, and reused across processes. The size of
+    this cache may be bounded.
 
     Args:
-        None
+        cache_max_bytes:
+            An optional int, specifying the maximum size of the TeX cache
+            in bytes. If given, the least recently used snippets exceeding
+            it are evicted, see tex_cache_prune(). Defaults to None, i.e.
+            no limit.
 
     Returns:
         None
     """
-    rc('text', usetex=True)
+    matplotlib.rc('text', usetex=True)
     params = {'text.latex.preamble': r'\usepackage{amsmath}'}
-    plt.rcParams.update(params)
+    matplotlib.rcParams.update(params)
+    if cache_max_bytes is not None:
+        tex_cache_prune(cache_max_bytes)
 
 
 def texoff() -> None:
@@ -101,7 +821,92 @@ def texoff() -> None:
     Returns:
         None
     """
-    rc('text', usetex=False)
+    matplotlib.rc('text', usetex=False)
+
+
+#############
+# TeX cache #
+#############
+
+
+def tex_prewarm(texts: Sequence[str],
+                fontsize: float = 30,
+                dpi: Optional[float] = None) -> None:
+    """Renders known texts into the TeX cache ahead of time, so figures
+    using them do not have to run LaTeX. Call after texon(), since the
+    cache is keyed by the preamble set there.
+
+    Args:
+        texts:
+            A sequence of strings, containing the texts to render.
+        fontsize:
+            An optional float, specifying the font size the texts are
+            rendered with. Defaults to 30, the default of labels().
+        dpi:
+            An optional float. If given, the raster images used for
+            PNG exports at this DPI are cached as well. Defaults to None.
+
+    Returns:
+        None
+    """
+
+    manager = matplotlib.texmanager.TexManager()
+    for text in texts:
+        if not text.strip():
+            continue
+        cached = Path(manager.get_basefile(text, fontsize) + ".dvi").exists()
+        _TEX_STATS["hits" if cached else "misses"] += 1
+        manager.make_dvi(text, fontsize)
+        if dpi is not None:
+            manager.make_png(text, fontsize, dpi)
+
+
+def tex_cache_prune(max_bytes: int) -> None:
+    """Evicts the least recently used files from the TeX cache, until
+    its size does not exceed max_bytes.
+
+    Args:
+        max_bytes:
+            An int, specifying the maximum size of the cache in bytes.
+
+    Returns:
+        None
+    """
+
+    if max_bytes < 0:
+        raise ValueError("Parameter max_bytes must not be negative.")
+
+    files = [(path, path.stat()) for path in _tex_cache_files()]
+    files.sort(key=lambda item: max(item[1].st_atime, item[1].st_mtime))
+    total = sum(stat.st_size for _, stat in files)
+    for path, stat in files:
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= stat.st_size
+        _TEX_STATS["evicted"] += 1
+
+
+def tex_cache_stats() -> Dict[str, int]:
+    """Reports the size of the TeX cache, as well as the cache hits and
+    misses of tex_prewarm() and the evictions of tex_cache_prune() in
+    this process.
+
+    Args:
+        None
+
+    Returns:
+        stats:
+            A dictionary with the number of "files" and "bytes" in the
+            cache, and the counts "hits", "misses" and "evicted".
+    """
+
+    files = _tex_cache_files()
+    return {
+        "files": len(files),
+        "bytes": sum(path.stat().st_size for path in files),
+        **_TEX_STATS
+    }
 
 
 ####################
@@ -109,8 +914,9 @@ def texoff() -> None:
 ####################
 
 
-def singleplot(size: Tuple[float, float] = (
-    10, 7)) -> Tuple[matplotlib.figure.Figure, plt.Axes]:
+def singleplot(
+        size: Tuple[float, float] = (10, 7), pyplot: bool = True
+) -> Tuple[matplotlib.figure.Figure, plt.Axes]:
     """Generates a new single-plot figure.
     The figure size may be defined explicitly.
 
@@ -119,6 +925,13 @@ def singleplot(size: Tuple[float, float] = (
             An optional tuple of two floats, containing
             the desired figure width and heigth in inches.
             Defaults to 10x7 inches.
+        pyplot:
+            An optional bool, specifying whether the figure is registered
+            with pyplot and becomes the current figure. If False, the
+            figure gets its own Agg canvas and does not touch any global
+            state, so figures can be built concurrently from several
+            threads. Such figures must be passed explicitly to the export
+            functions. Defaults to True.
 
     Returns:
         fig:
@@ -127,16 +940,20 @@ def singleplot(size: Tuple[float, float] = (
             A pyplot.Axes instance
     """
 
-    fig, ax = plt.subplots(1, 1, figsize=size)
+    fig = _new_figure(size, pyplot)
+    ax = fig.subplots(1, 1)
     return fig, ax
 
 
-def multiplot(
+def multiplot(  # pylint: disable=too-many-arguments,too-many-positional-arguments
     nrows: int,
     ncols: int,
     size_xy: Tuple[float, float],
     wspace: Optional[float] = None,
-    hspace: Optional[float] = None
+    hspace: Optional[float] = None,
+    pyplot: bool = True,
+    sharex: Union[bool, Literal["none", "all", "row", "col"]] = False,
+    sharey: Union[bool, Literal["none", "all", "row", "col"]] = False
 ) -> Tuple[matplotlib.figure.Figure, plt.Axes]:
     """Generates a new figure consisting of nrows rows
     and ncols columns of plots with overall figure size size_xy.
@@ -152,6 +969,16 @@ def multiplot(
         hspace:
             An optional float, specifying the vertical
             distance between rows. Defaults to zero.
+        pyplot:
+            An optional bool, specifying whether the figure is registered
+            with pyplot, see singleplot(). Defaults to True.
+        sharex:
+            An optional bool or string, specifying whether the plots share
+            their x-axis. Possible values are True or "all", False or "none",
+            "row" and "col". Defaults to False.
+        sharey:
+            An optional bool or string, specifying whether the plots share
+            their y-axis, analogous to sharex. Defaults to False.
 
     Returns:
         fig:
@@ -160,20 +987,400 @@ def multiplot(
             An array of pyplot.Axes instances
     """
 
-    fig, ax = plt.subplots(nrows, ncols, figsize=size_xy)
+    fig = _new_figure(size_xy, pyplot)
+    ax = fig.subplots(nrows, ncols, sharex=sharex, sharey=sharey)
     if hspace is not None:
-        plt.subplots_adjust(hspace=hspace)
+        fig.subplots_adjust(hspace=hspace)
     if wspace is not None:
-        plt.subplots_adjust(wspace=wspace)
+        fig.subplots_adjust(wspace=wspace)
     return fig, ax
 
 
+class Panel:
+    """A handle on one panel of a smallmultiples() grid. All panels are drawn
+    into the same pyplot.Axes instance, and the transform of a panel maps its
+    data coordinates into its own box of that axes.
+
+    Args:
+        ax:
+            The pyplot.Axes instance holding all panels.
+        transform:
+            A matplotlib transform from panel data to display coordinates.
+        clip:
+            A bounding box in display coordinates, outside of which
+            the artists of the panel are clipped.
+    """
+
+    def __init__(self, ax: plt.Axes, transform: Any, clip: Any):
+        self.ax = ax
+        self.transform = transform
+        self._clip = clip
+
+    def plot(self, *args, **kwargs) -> List[matplotlib.lines.Line2D]:
+        """Plots lines into the panel, see pyplot.Axes.plot().
+
+        Args:
+            *args, **kwargs:
+                Passed to pyplot.Axes.plot().
+
+        Returns:
+            lines:
+                A list of the matplotlib.lines.Line2D instances added.
+        """
+
+        added = self.ax.plot(*args, transform=self.transform, **kwargs)
+        for line in added:
+            line.set_clip_box(self._clip)
+        return added
+
+    def scatter(self, x: ArrayLike, y: ArrayLike,
+                **kwargs) -> matplotlib.collections.PathCollection:
+        """Plots points into the panel, see pyplot.Axes.scatter().
+
+        Args:
+            x, y:
+                Arrays containing the coordinates of the points.
+            **kwargs:
+                Passed to pyplot.Axes.scatter().
+
+        Returns:
+            collection:
+                The matplotlib.collections.PathCollection instance added.
+        """
+
+        collection = self.ax.scatter(x, y, transform=self.transform, **kwargs)
+        collection.set_clip_box(self._clip)
+        return collection
+
+    def add_artist(self, artist: Any) -> Any:
+        """Adds an artist, e.g. a patch or a collection, to the panel.
+        Its coordinates are interpreted as data coordinates of the panel.
+
+        Args:
+            artist:
+                A matplotlib.artist.Artist instance.
+
+        Returns:
+            artist:
+                The artist added.
+        """
+
+        artist.set_transform(self.transform)
+        artist.set_clip_box(self._clip)
+        return self.ax.add_artist(artist)
+
+    def title(self, text: str, fontsize: float = 10) -> None:
+        """Adds a title above the panel.
+
+        Args:
+            text:
+                A string containing the title to add.
+            fontsize:
+                An optional float, specifying the font
+                size of the title. Defaults to 10.
+
+        Returns:
+            None
+        """
+
+        self.ax.annotate(text, (0.5, 1),
+                         xycoords=self._clip,
+                         xytext=(0, 2),
+                         textcoords="offset points",
+                         ha="center",
+                         va="bottom",
+                         fontsize=fontsize)
+
+
+def smallmultiples(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    nrows: int,
+    ncols: int,
+    size_xy: Tuple[float, float],
+    xlimits: Tuple[float, float],
+    ylimits: Tuple[float, float],
+    xticks: Optional[Sequence[float]] = None,
+    yticks: Optional[Sequence[float]] = None,
+    spacing: float = 0.2,
+    pyplot: bool = True) -> Tuple[matplotlib.figure.Figure, plt.Axes,
+                                  np.ndarray]:
+    """Generates a new figure with a grid of nrows rows and ncols columns of
+    small panels sharing their axes limits. Unlike multiplot(), all panels
+    are drawn into one pyplot.Axes instance, and the frames and ticks of all
+    panels are drawn as a few shared artists, with tick labels only along
+    the bottom row and left column. This keeps building and drawing large
+    grids fast, but panels must be plotted into via their Panel handles.
+
+    Args:
+        nrows, ncols:
+            Ints, specifying the number of rows and columns of panels.
+        size_xy:
+            A tuple of two floats, containing the desired
+            figure width and heigth in inches.
+        xlimits, ylimits:
+            Tuples of two floats, containing the limits
+            of the x- and y-axis shared by all panels.
+        xticks, yticks:
+            Optional lists of floats, containing the tick positions
+            of the x- and y-axis. Defaults to None, i.e. automatic ticks.
+        spacing:
+            An optional float, specifying the distance between panels
+            as fraction of the panel size. Defaults to 0.2.
+        pyplot:
+            An optional bool, specifying whether the figure is registered
+            with pyplot, see singleplot(). Defaults to True.
+
+    Returns:
+        fig:
+            A matplotlib.figure.Figure instance
+        ax:
+            The pyplot.Axes instance holding all panels
+        panels:
+            An array of shape (nrows, ncols) of Panel instances
+    """
+
+    if nrows < 1 or ncols < 1:
+        raise ValueError("Parameters nrows and ncols must be at least 1.")
+    if xlimits[0] == xlimits[1] or ylimits[0] == ylimits[1]:
+        raise ValueError("Pass two different values in xlimits and ylimits.")
+    if not 0 <= spacing < 1:
+        raise ValueError("Parameter spacing must be in [0, 1).")
+
+    fig = _new_figure(size_xy, pyplot)
+    ax = fig.subplots(1, 1)
+    ax.set_axis_off()
+    ax.set_xlim(0, ncols)
+    ax.set_ylim(0, nrows)
+    ax.set_autoscale_on(False)
+
+    # Panel (row, col) covers [col, col + 1] x [nrows - row - 1, nrows - row]
+    # of the axes, less the spacing, with row 0 at the top as in multiplot()
+    scale_x = (1 - spacing) / (xlimits[1] - xlimits[0])
+    scale_y = (1 - spacing) / (ylimits[1] - ylimits[0])
+    panels = np.empty((nrows, ncols), dtype=object)
+    corners = []
+    affines = []
+    for row in range(nrows):
+        for col in range(ncols):
+            x0, y0 = col + spacing / 2, nrows - row - 1 + spacing / 2
+            affine = matplotlib.transforms.Affine2D().scale(
+                scale_x, scale_y).translate(x0 - xlimits[0] * scale_x,
+                                            y0 - ylimits[0] * scale_y)
+            clip = matplotlib.transforms.TransformedBbox(
+                matplotlib.transforms.Bbox.from_extents(
+                    x0, y0, x0 + 1 - spacing, y0 + 1 - spacing), ax.transData)
+            panels[row, col] = Panel(ax, affine + ax.transData, clip)
+            corners.append((x0, y0, x0 + 1 - spacing, y0 + 1 - spacing))
+            affines.append(affine)
+
+    rcparams: Any = matplotlib.rcParams
+    rectangles(ax,
+               corners,
+               fill=False,
+               color=rcparams["axes.edgecolor"],
+               linewidth=rcparams["axes.linewidth"],
+               zorder=2.5)
+
+    for which, bounds, ticks, marker in (("x", xlimits, xticks,
+                                          matplotlib.markers.MarkerStyle(
+                                              matplotlib.markers.TICKDOWN)),
+                                         ("y", ylimits, yticks,
+                                          matplotlib.markers.MarkerStyle(
+                                              matplotlib.markers.TICKLEFT))):
+        if ticks is None:
+            ticks = matplotlib.ticker.MaxNLocator(4).tick_values(*bounds)
+        ticks = [tick for tick in ticks if min(bounds) <= tick <= max(bounds)]
+        # Panel coordinates of the tick marks at the bottom or left edge
+        marks = np.array([(tick, ylimits[0]) if which == "x" else
+                          (xlimits[0], tick)
+                          for tick in ticks]).reshape(-1, 2)
+        points = np.concatenate(
+            [affine.transform(marks) for affine in affines])
+        ax.add_line(
+            matplotlib.lines.Line2D(
+                *points.T,
+                linestyle="",
+                marker=marker,
+                markersize=rcparams[f"{which}tick.major.size"],
+                markeredgewidth=rcparams[f"{which}tick.major.width"],
+                color=rcparams[f"{which}tick.color"]))
+        outer = affines[-ncols:] if which == "x" else affines[::ncols]
+        for affine in outer:
+            for point, tick in zip(affine.transform(marks), ticks):
+                ax.annotate(f"{tick:g}",
+                            point,
+                            xytext=(0, -4) if which == "x" else (-4, 0),
+                            textcoords="offset points",
+                            ha="center" if which == "x" else "right",
+                            va="top" if which == "x" else "center",
+                            fontsize=rcparams[f"{which}tick.labelsize"])
+
+    return fig, ax, panels
+
+
+class FigurePool:
+    """A bounded pool of figures, which hands out cleared, pre-built figures
+    instead of building a new figure, axes, spines and ticks per chart.
+    Figures are keyed by their layout, are not registered with pyplot,
+    and are returned to the pool with release() after exporting them.
+    If the pool is full, the least recently used idle figure is evicted.
+    Recycled figures keep the colours that were active when they were built.
+
+    Args:
+        maxsize:
+            An optional int, specifying the maximum number of idle
+            figures kept in the pool. Defaults to 16.
+    """
+
+    def __init__(self, maxsize: int = 16):
+        if maxsize < 1:
+            raise ValueError("Parameter maxsize must be at least 1.")
+        self.maxsize = maxsize
+        self._idle: OrderedDict[Hashable, List[Tuple[matplotlib.figure.Figure,
+                                                     Any]]] = OrderedDict()
+        self._layouts: weakref.WeakKeyDictionary[
+            matplotlib.figure.Figure,
+            Tuple[Hashable, Any]] = weakref.WeakKeyDictionary()
+        self._shapes: Dict[Hashable, Tuple[Tuple[float, float],
+                                           Dict[str, float]]] = {}
+        self._counts = {"allocated": 0, "recycled": 0, "evicted": 0}
+
+    def _acquire(self, key: Hashable,
+                 build: Callable[[], Tuple[Any, Any]]) -> Tuple[Any, Any]:
+        ''' Hands out an idle figure of the given layout, or builds one '''
+        if self._idle.get(key):
+            fig, ax = self._idle[key].pop()
+            if not self._idle[key]:
+                del self._idle[key]
+            self._counts["recycled"] += 1
+        else:
+            fig, ax = build()
+            self._counts["allocated"] += 1
+            if key not in self._shapes:
+                self._shapes[key] = (tuple(fig.get_size_inches()),
+                                     vars(fig.subplotpars).copy())
+        self._layouts[fig] = (key, ax)
+        return fig, ax
+
+    def singleplot(
+        self, size: Tuple[float, float] = (10, 7)
+    ) -> Tuple[matplotlib.figure.Figure, plt.Axes]:
+        """Hands out a single-plot figure, see singleplot().
+
+        Args:
+            size:
+                An optional tuple of two floats, containing
+                the desired figure width and heigth in inches.
+                Defaults to 10x7 inches.
+
+        Returns:
+            fig:
+                A matplotlib.figure.Figure instance
+            ax:
+                A pyplot.Axes instance
+        """
+
+        key = ("singleplot", tuple(size))
+        return self._acquire(key, lambda: singleplot(size, pyplot=False))
+
+    def multiplot(
+        self,
+        nrows: int,
+        ncols: int,
+        size_xy: Tuple[float, float],
+        wspace: Optional[float] = None,
+        hspace: Optional[float] = None
+    ) -> Tuple[matplotlib.figure.Figure, plt.Axes]:
+        """Hands out a multi-plot figure, see multiplot().
+
+        Args:
+            nrows:
+                An int, specifying the number of rows.
+            ncols:
+                An int, specifying the number of columns.
+            size_xy:
+                An tuple of two floats, containing the desired
+                figure width and heigth in inches.
+            wspace:
+                An optional float, specifying the horizontal
+                distance between columns. Defaults to zero.
+            hspace:
+                An optional float, specifying the vertical
+                distance between rows. Defaults to zero.
+
+        Returns:
+            fig:
+                A matplotlib.figure.Figure instance
+            ax:
+                An array of pyplot.Axes instances
+        """
+
+        key = ("multiplot", nrows, ncols, tuple(size_xy), wspace, hspace)
+        return self._acquire(
+            key, lambda: multiplot(
+                nrows, ncols, size_xy, wspace, hspace, pyplot=False))
+
+    def release(self, fig: matplotlib.figure.Figure) -> None:
+        """Returns a figure handed out by this pool, after it has been
+        exported. The figure is cleared and must not be used afterwards.
+        Figures already closed, e.g. by save_png(close=True), cannot be
+        recycled and are dropped instead, counting as evicted.
+
+        Args:
+            fig:
+                A matplotlib.figure.Figure instance handed out by this pool.
+
+        Returns:
+            None
+        """
+
+        if fig not in self._layouts:
+            raise ValueError("Pass a figure handed out by this pool.")
+
+        key, ax = self._layouts.pop(fig)
+        axes = _flat_axes(ax)
+        # Figures exported with close=True were already cleared
+        if any(item not in fig.axes for item in axes):
+            self._counts["evicted"] += 1
+            return
+        size, subplotpars = self._shapes[key]
+        _reset_figure(fig, axes)
+        fig.set_size_inches(size)
+        fig.subplots_adjust(**subplotpars)
+
+        if sum(len(figs) for figs in self._idle.values()) >= self.maxsize:
+            oldest = next(iter(self._idle))
+            _release_figure(self._idle[oldest].pop(0)[0])
+            if not self._idle[oldest]:
+                del self._idle[oldest]
+            self._counts["evicted"] += 1
+
+        self._idle.setdefault(key, []).append((fig, ax))
+        self._idle.move_to_end(key)
+
+    def stats(self) -> Dict[str, int]:
+        """Reports how many figures the pool has built, recycled and evicted.
+
+        Args:
+            None
+
+        Returns:
+            stats:
+                A dictionary with the counts "allocated", "recycled",
+                "evicted", as well as the number of "idle" figures.
+        """
+
+        return {
+            **self._counts, "idle":
+            sum(len(figs) for figs in self._idle.values())
+        }
+
+
 #############################
 # Adding elements to a plot #
 #############################
 
 
-def title(ax: plt.Axes,
+def title(ax: AxesLike,
           plottitle: str,
           fontsize: float = 30,
           pad: float = 20) -> None:
@@ -181,7 +1388,8 @@ def title(ax: plt.Axes,
 
     Args:
         ax:
-            A pyplot.Axes instance
+            A pyplot.Axes instance, or an array or sequence
+            of them, such as returned by multiplot().
         plottitle:
             A string containing the title to add.
         fontsize:
@@ -195,22 +1403,23 @@ def title(ax: plt.Axes,
         None
     """
 
-    if not hasattr(ax, 'plot'):
-        raise ValueError("Pass a valid plot in parameter ax.")
-
-    ax.set_title(plottitle, fontsize=fontsize, pad=pad)
+    for axis in _flat_axes(ax):
+        axis.set_title(plottitle, fontsize=fontsize, pad=pad)
 
 
-def labels(ax: plt.Axes,
-           xlabel: Optional[str] = None,
-           ylabel: Optional[str] = None,
-           fontsize: float = 30,
-           pad: float = 15) -> None:
+def labels(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        ax: AxesLike,
+        xlabel: Optional[str] = None,
+        ylabel: Optional[str] = None,
+        fontsize: float = 30,
+        pad: float = 15,
+        outer: bool = False) -> None:
     """Adds axes labels to an existing plot.
 
     Args:
         ax:
-            A pyplot.Axes instance
+            A pyplot.Axes instance, or an array or sequence
+            of them, such as returned by multiplot().
         xlabel:
             An optional string containing the label to be
             added to the x-axis of the plot.
@@ -223,19 +1432,24 @@ def labels(ax: plt.Axes,
         pad:
             An optional float, specifying the padding between
             labels and figure. Defaults to 15.
+        outer:
+            An optional bool. If True, the x-axis label is only added to
+            the bottom row and the y-axis label only to the left column
+            of a grid of plots, e.g. for plots sharing their axes.
+            Defaults to False.
 
     Returns:
         None
     """
 
-    if not hasattr(ax, 'plot'):
-        raise ValueError("Pass a valid plot in parameter ax.")
+    for axis in _flat_axes(ax):
+        spec = axis.get_subplotspec() if outer else None
 
-    if xlabel is not None:
-        ax.set_xlabel(xlabel, fontsize=fontsize, labelpad=pad)
+        if xlabel is not None and (spec is None or spec.is_last_row()):
+            axis.set_xlabel(xlabel, fontsize=fontsize, labelpad=pad)
 
-    if ylabel is not None:
-        ax.set_ylabel(ylabel, fontsize=fontsize, labelpad=pad)
+        if ylabel is not None and (spec is None or spec.is_first_col()):
+            axis.set_ylabel(ylabel, fontsize=fontsize, labelpad=pad)
 
 
 def diagonal(ax: plt.Axes,
@@ -314,14 +1528,66 @@ def rectangle(ax: plt.Axes, x1: float, y1: float, x2: float, y2: float,
     if not hasattr(ax, 'plot'):
         raise ValueError("Pass a valid plot in parameter ax.")
 
-    ax.add_patch(Rectangle((x1, y1), x2 - x1, y2 - y1, **kwargs))
+    ax.add_patch(
+        matplotlib.patches.Rectangle((x1, y1), x2 - x1, y2 - y1, **kwargs))
+
+
+def rectangles(ax: plt.Axes, coords: ArrayLike,
+               **kwargs) -> matplotlib.collections.PolyCollection:
+    """Adds many rectangles to an existing plot at once, as a single
+    artist instead of one patch per rectangle. Like rectangle(), each
+    rectangle is given by the x and y coordinates of two corners.
+
+    Args:
+        ax:
+            A pyplot.Axes instance
+        coords:
+            An array of shape (N, 4), containing the coordinates
+            x1, y1, x2, y2 of the two corners of each rectangle.
+        **kwargs:
+            Named arguments such as color, fill, linewidth, linestyle.
+            Colours and widths may also be given per rectangle.
+            Passed to matplotlib.collections.PolyCollection().
+
+    Returns:
+        collection:
+            The matplotlib.collections.PolyCollection instance
+            of the rectangles.
+    """
+    try:
+        corners = np.asarray(coords, dtype=float)
+    except Exception as ex:
+        raise ValueError("Pass numbers in coords.") from ex
 
+    if corners.ndim != 2 or corners.shape[1] != 4:
+        raise ValueError("Pass coords as array of shape (N, 4).")
 
-def legend(ax: plt.Axes,
-           loc: Union["str", int] = "best",
-           fontsize: float = 30,
-           frame: bool = False,
-           **kwargs) -> None:
+    if not hasattr(ax, 'plot'):
+        raise ValueError("Pass a valid plot in parameter ax.")
+
+    x1, y1, x2, y2 = corners.T
+    verts: Any = np.stack((x1, y1, x2, y1, x2, y2, x1, y2),
+                          axis=1).reshape(-1, 4, 2)
+
+    # Patches accept fill, collections need a transparent face colour instead
+    if not kwargs.pop("fill", True):
+        kwargs["edgecolor"] = kwargs.pop(
+            "color",
+            kwargs.get("edgecolor", matplotlib.rcParams["patch.edgecolor"]))
+        kwargs["facecolor"] = "none"
+
+    collection = matplotlib.collections.PolyCollection(verts, **kwargs)
+    ax.add_collection(collection, autolim=True)
+    return collection
+
+
+def legend(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        ax: plt.Axes,
+        loc: Union["str", int] = "best",
+        fontsize: float = 30,
+        frame: bool = False,
+        threshold: int = 100000,
+        **kwargs) -> None:
     """Adds a legend to an existing plot.
 
     Args:
@@ -330,11 +1596,18 @@ def legend(ax: plt.Axes,
         loc:
             A string, specifying the legend position,
             following matplotlib syntax. Defaults to "best".
+            Additionally, "fast" places the legend like "best", but scores
+            the candidate positions on a coarse grid counting the data
+            points, which is much faster for axes with lots of data.
         fontsize:
             A float, specifying the font size. Defaults to 30.
         frame:
             A bool, specifying whether to draw a frame around the legend.
             Defaults to false, i.e. no.
+        threshold:
+            An optional int. With loc="fast", axes with at most this many
+            data points use matplotlib's exact "best" placement instead.
+            Defaults to 100000.
         **kwargs:
             Named arguments such as color, fill, linewidth, linestyle.
             Passed to ax.legend().
@@ -346,7 +1619,249 @@ def legend(ax: plt.Axes,
     if not hasattr(ax, 'plot'):
         raise ValueError("Pass a valid plot in parameter ax.")
 
-    ax.legend(loc=loc, fontsize=fontsize, frameon=frame, **kwargs)
+    if loc == "fast" and _count_data_points(ax) <= threshold:
+        loc = "best"
+
+    if loc == "fast":
+        handle = ax.legend(loc="upper right",
+                           fontsize=fontsize,
+                           frameon=frame,
+                           **kwargs)
+        handle.set_loc(_fast_legend_loc(ax, handle))
+    else:
+        ax.legend(loc=loc, fontsize=fontsize, frameon=frame, **kwargs)
+
+
+#################
+# Plotting data #
+#################
+
+
+def decimated_line(ax: plt.Axes,
+                   x: ArrayLike,
+                   y: ArrayLike,
+                   buckets: Optional[int] = None,
+                   **kwargs) -> matplotlib.lines.Line2D:
+    """Plots a line with very many points, drawing only the first, minimal,
+    maximal and last point of the data falling into each pixel column.
+    This looks the same as plotting all points, but keeps drawing time
+    and file sizes independent of the number of points. The line is
+    decimated again whenever the x limits change, e.g. by limits().
+
+    Args:
+        ax:
+            A pyplot.Axes instance
+        x:
+            An array or sequence of floats, containing the x coordinates.
+            Must be sorted in ascending order.
+        y:
+            An array or sequence of floats, containing the y coordinates.
+        buckets:
+            An optional int, specifying the number of columns the
+            visible data is divided into. Defaults to None, i.e. the
+            width of the plot in pixels at the figure's DPI.
+        **kwargs:
+            Named arguments such as color, linewidth, linestyle, label.
+            Passed to ax.plot().
+
+    Returns:
+        line:
+            The matplotlib.lines.Line2D instance of the plotted line.
+    """
+
+    if not hasattr(ax, 'plot'):
+        raise ValueError("Pass a valid plot in parameter ax.")
+
+    try:
+        xdata = np.asarray(x, dtype=float)
+        ydata = np.asarray(y, dtype=float)
+    except Exception as ex:
+        raise ValueError("Pass numbers in x and y.") from ex
+
+    if xdata.ndim != 1 or xdata.shape != ydata.shape or len(xdata) == 0:
+        raise ValueError(
+            "Pass x and y as non-empty sequences of equal length.")
+
+    if np.any(np.diff(xdata) < 0):
+        raise ValueError("Pass x sorted in ascending order.")
+
+    if buckets is not None and buckets < 1:
+        raise ValueError("Parameter buckets must be at least 1.")
+
+    def columns() -> int:
+        return buckets or max(int(ax.bbox.width), 1)
+
+    line, = ax.plot(*_decimate(xdata, ydata, xdata[0], xdata[-1], columns()),
+                    **kwargs)
+    _DECIMATED[line] = (xdata, ydata)
+
+    # The callback holds the line only weakly, and disconnects itself once
+    # the line has been removed, so that removed lines and their data can
+    # be freed
+    line_ref = weakref.ref(line)
+
+    def update(changed: plt.Axes) -> None:
+        target = line_ref()
+        if target is None or target.axes is not changed:
+            changed.callbacks.disconnect(callback)
+            return
+        xmin, xmax = sorted(changed.get_xlim())
+        target.set_data(*_decimate(*_DECIMATED[target], xmin, xmax, columns()))
+
+    callback = ax.callbacks.connect("xlim_changed", update)
+    weakref.finalize(line, ax.callbacks.disconnect, callback)
+    return line
+
+
+def density_scatter(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    ax: plt.Axes,
+    x: ArrayLike,
+    y: ArrayLike,
+    threshold: int = 100000,
+    dpi: Optional[float] = None,
+    cmap: str = "viridis",
+    **kwargs
+) -> Union[matplotlib.collections.PathCollection, matplotlib.image.AxesImage]:
+    """Plots a scatter plot, which switches to a density image for very
+    many points. Above the threshold, the points are binned into one bin
+    per pixel and drawn as a single raster image coloured by the number of
+    points per pixel, while axes, labels and spines stay vector graphics.
+    This keeps drawing time and file sizes independent of the number of
+    points. Empty pixels are transparent.
+
+    Args:
+        ax:
+            A pyplot.Axes instance
+        x:
+            An array or sequence of floats, containing the x coordinates.
+        y:
+            An array or sequence of floats, containing the y coordinates.
+        threshold:
+            An optional int, specifying the number of points above which
+            a density image is drawn. Defaults to 100000.
+        dpi:
+            An optional float, specifying the resolution of the density
+            image. Defaults to None, i.e. the figure's DPI.
+        cmap:
+            An optional string, specifying the colour map of the density
+            image. Defaults to "viridis".
+        **kwargs:
+            Named arguments such as color, s, marker, label.
+            Passed to ax.scatter() below the threshold. Above it, only
+            label, alpha and zorder are passed to ax.imshow(), while the
+            other arguments only style scatter points and are ignored.
+
+    Returns:
+        artist:
+            A matplotlib.collections.PathCollection instance below the
+            threshold, and a matplotlib.image.AxesImage instance above.
+    """
+
+    if not hasattr(ax, 'plot'):
+        raise ValueError("Pass a valid plot in parameter ax.")
+
+    try:
+        xdata = np.asarray(x, dtype=float).ravel()
+        ydata = np.asarray(y, dtype=float).ravel()
+    except Exception as ex:
+        raise ValueError("Pass numbers in x and y.") from ex
+
+    if xdata.shape != ydata.shape:
+        raise ValueError("Pass x and y as sequences of equal length.")
+
+    if len(xdata) <= threshold:
+        return ax.scatter(xdata, ydata, **kwargs)
+
+    finite = np.isfinite(xdata) & np.isfinite(ydata)
+    if not finite.any():
+        raise ValueError("Pass at least one finite point in x and y.")
+    xdata, ydata = xdata[finite], ydata[finite]
+    scale = (dpi or ax.figure.dpi) / ax.figure.dpi
+    bins = (max(int(ax.bbox.width * scale),
+                1), max(int(ax.bbox.height * scale), 1))
+    extent = (*_padded_range(xdata), *_padded_range(ydata))
+    counts, _, _ = np.histogram2d(xdata,
+                                  ydata,
+                                  bins=bins,
+                                  range=(extent[:2], extent[2:]))
+    return ax.imshow(np.ma.masked_equal(counts.T, 0),
+                     extent=extent,
+                     origin="lower",
+                     aspect="auto",
+                     interpolation="nearest",
+                     cmap=cmap,
+                     **{
+                         key: value
+                         for key, value in kwargs.items()
+                         if key in ("label", "alpha", "zorder")
+                     })
+
+
+def lines(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        ax: plt.Axes,
+        ys: Union[ArrayLike, Sequence[ArrayLike]],
+        x: Optional[ArrayLike] = None,
+        colors: Optional[Union[str, Sequence[Any]]] = None,
+        linewidths: Union[float, Sequence[float]] = 1.5,
+        alpha: Optional[Union[float, Sequence[float]]] = None,
+        **kwargs) -> matplotlib.collections.LineCollection:
+    """Plots many series at once as a single artist, instead of calling
+    ax.plot() once per series. Colours, line widths and alphas may be set
+    per series. The series form one legend entry if a label is passed,
+    so calling this function once per group yields one entry per group.
+
+    Args:
+        ax:
+            A pyplot.Axes instance
+        ys:
+            A 2D array with one series per row, or a sequence of
+            arrays of possibly different lengths, containing the
+            y coordinates.
+        x:
+            An optional array or sequence of floats, containing the
+            x coordinates shared by all series. Defaults to None,
+            i.e. 0, 1, 2, ... for each series.
+        colors:
+            An optional colour or sequence of colours, one per series,
+            following matplotlib's colour syntax. Defaults to None,
+            i.e. the next colours of the colour cycle of the axes, one
+            per series, or one for all series if a label is passed.
+        linewidths:
+            An optional float or sequence of floats, one per series,
+            specifying the line widths. Defaults to 1.5.
+        alpha:
+            An optional float or sequence of floats, one per series,
+            specifying the opacity. Defaults to None, i.e. opaque.
+        **kwargs:
+            Named arguments such as linestyle, label, zorder.
+            Passed to matplotlib.collections.LineCollection().
+
+    Returns:
+        collection:
+            The matplotlib.collections.LineCollection instance of the series.
+    """
+
+    if not hasattr(ax, 'plot'):
+        raise ValueError("Pass a valid plot in parameter ax.")
+
+    segments = _line_segments(ys, x)
+
+    if colors is None:
+        # Continue the colour cycle of the axes, as ax.plot() does
+        cycle = getattr(ax, "_get_lines")
+        if kwargs.get("label") is None:
+            colors = [cycle.get_next_color() for _ in segments]
+        else:
+            colors = [cycle.get_next_color()] * len(segments)
+
+    collection = matplotlib.collections.LineCollection(
+        segments,
+        colors=matplotlib.colors.to_rgba_array(colors, alpha),
+        linewidths=linewidths,
+        **kwargs)
+    ax.add_collection(collection, autolim=True)
+    ax.autoscale_view()
+    return collection
 
 
 #############################
@@ -354,13 +1869,14 @@ def legend(ax: plt.Axes,
 #############################
 
 
-def despine(ax: plt.Axes, which: SPINES = ('top', 'right')) -> None:
+def despine(ax: AxesLike, which: SPINES = ('top', 'right')) -> None:
     """Remove spines of an existing plot.
     Spines can be specified, default is top and right.
 
     Args:
         ax:
-            A pyplot.Axes instance
+            A pyplot.Axes instance, or an array or sequence
+            of them, such as returned by multiplot().
         which:
             A tuple of strings, specifying which spines to remove.
             Defaults to ["top", "right"].
@@ -370,20 +1886,19 @@ def despine(ax: plt.Axes, which: SPINES = ('top', 'right')) -> None:
         None
     """
 
-    if not hasattr(ax, 'plot'):
-        raise ValueError("Pass a valid plot in parameter ax.")
-
-    for spine in which:
-        ax.spines[spine].set_visible(False)
+    for axis in _flat_axes(ax):
+        for spine in which:
+            axis.spines[spine].set_visible(False)
 
 
-def respine(ax: plt.Axes, which: SPINES = ('top', 'right')) -> None:
+def respine(ax: AxesLike, which: SPINES = ('top', 'right')) -> None:
     """Adds spines to an existing plot.
     Spines can be specified, default is top and right.
 
     Args:
         ax:
-            A pyplot.Axes instance
+            A pyplot.Axes instance, or an array or sequence
+            of them, such as returned by multiplot().
         which:
             A tuple of strings, specifying which spines to add.
             Defaults to ["top", "right"].
@@ -393,19 +1908,18 @@ def respine(ax: plt.Axes, which: SPINES = ('top', 'right')) -> None:
         None
     """
 
-    if not hasattr(ax, 'plot'):
-        raise ValueError("Pass a valid plot in parameter ax.")
+    for axis in _flat_axes(ax):
+        for spine in which:
+            axis.spines[spine].set_visible(True)
 
-    for spine in which:
-        ax.spines[spine].set_visible(True)
 
-
-def ticklabelsize(ax: plt.Axes, which: str = "both", size: float = 30) -> None:
+def ticklabelsize(ax: AxesLike, which: str = "both", size: float = 30) -> None:
     """Changes ticklabelsize of an existing plot.
 
     Args:
         ax:
-            A pyplot.Axes instance
+            A pyplot.Axes instance, or an array or sequence
+            of them, such as returned by multiplot().
         which:
             A string, specifying the axes for which tick label size is changed.
             Possible are "x", "y", and "both". Defaults to "both".
@@ -419,23 +1933,22 @@ def ticklabelsize(ax: plt.Axes, which: str = "both", size: float = 30) -> None:
         raise ValueError(
             'Parameter which must be one of "x", "y", "xy", "yx", "both".')
 
-    if not hasattr(ax, 'plot'):
-        raise ValueError("Pass a valid plot in parameter ax.")
+    for axis in _flat_axes(ax):
+        if which in ["x", "xy", "yx", "both"]:
+            axis.tick_params("x", labelsize=size)
+        if which in ["y", "xy", "yx", "both"]:
+            axis.tick_params("y", labelsize=size)
 
-    if which in ["x", "xy", "yx", "both"]:
-        ax.tick_params("x", labelsize=size)
-    if which in ["y", "xy", "yx", "both"]:
-        ax.tick_params("y", labelsize=size)
 
-
-def limits(ax: plt.Axes,
+def limits(ax: AxesLike,
            xlimits: Optional[Tuple[float, float]] = None,
            ylimits: Optional[Tuple[float, float]] = None) -> None:
     """Sets ax limits of an existing plot.
 
     Args:
         ax:
-            A pyplot.Axes instance
+            A pyplot.Axes instance, or an array or sequence
+            of them, such as returned by multiplot().
         xlimits:
             An optional tuple of two floats,
             containing the desired limits of the x-axis. Defaults to None.
@@ -447,25 +1960,28 @@ def limits(ax: plt.Axes,
         None
     """
 
-    if not hasattr(ax, 'plot'):
-        raise ValueError("Pass a valid plot in parameter ax.")
+    axes = _flat_axes(ax)
 
     if xlimits is not None:
-        ax.set_xlim(xlimits)
+        for axis in _share_leaders(axes, "x"):
+            axis.set_xlim(xlimits)
 
     if ylimits is not None:
-        ax.set_ylim(ylimits)
+        for axis in _share_leaders(axes, "y"):
+            axis.set_ylim(ylimits)
 
 
-def ticks_and_labels(ax: plt.Axes,
+def ticks_and_labels(ax: AxesLike,
                      which: str,
                      ticks: List[float],
-                     ticklabels: Optional[List[str]] = None) -> None:
+                     ticklabels: Optional[List[str]] = None,
+                     thin: bool = False) -> None:
     """Sets ticks and corresponding labels of one or both axes of an existing plot.
 
     Args:
         ax:
-            A pyplot.Axes instance
+            A pyplot.Axes instance, or an array or sequence
+            of them, such as returned by multiplot().
         which:
             A string, specifying the axis.
             Possible values are "x", "y", "xy", "yx", "both".
@@ -476,6 +1992,11 @@ def ticks_and_labels(ax: plt.Axes,
             axis labels corresponding to the specified tick positions.
             Defaults to None. If no list is provided, tick labels will
             be set to the numerical values of the provided ticks positions.
+        thin:
+            An optional bool. If True, only as many ticks are shown as fit
+            next to each other without overlapping labels, which is useful
+            for axes with very many categories. The shown ticks are updated
+            when the limits or the figure size change. Defaults to False.
 
     Returns:
         None
@@ -485,27 +2006,44 @@ def ticks_and_labels(ax: plt.Axes,
         raise ValueError(
             'Parameter which must be one of "x", "y", "xy", "yx", "both".')
 
-    if not hasattr(ax, 'plot'):
-        raise ValueError("Pass a valid plot in parameter ax.")
+    axes = _flat_axes(ax)
 
     if ticklabels is None:
         ticklabels = [str(tick) for tick in ticks]
 
-    if which in ["x", "xy", "yx", "both"]:
-        ax.set_xticks(ticks)
-        ax.set_xticklabels(ticklabels)
-
-    if which in ["y", "xy", "yx", "both"]:
-        ax.set_yticks(ticks)
-        ax.set_yticklabels(ticklabels)
-
-
-def rotate_ticklabels(ax: plt.Axes, which: str, rotation: float) -> None:
+    if len(ticklabels) != len(ticks):
+        raise ValueError("Pass one tick label per tick.")
+
+    if thin:
+        order = np.argsort(ticks)
+        positions = np.asarray(ticks, dtype=float)[order]
+        ticklabels = [ticklabels[index] for index in order]
+        names = dict(zip(positions.tolist(), ticklabels))
+        formatter = matplotlib.ticker.FuncFormatter(
+            lambda value, _: names.get(value, ""))
+
+    for name in ["x", "y"]:
+        if name not in which and which != "both":
+            continue
+        for axis in _share_leaders(axes, name):
+            ticker = axis.xaxis if name == "x" else axis.yaxis
+            if thin:
+                ticker.set_major_locator(
+                    _thinned_locator(positions, ticklabels, name))
+                ticker.set_major_formatter(formatter)
+            else:
+                ticker.set_ticks(ticks)
+                ticker.set_ticklabels(ticklabels)
+
+
+def rotate_ticklabels(ax: AxesLike, which: str, rotation: float) -> None:
     """Rotates tick labels of one or both axes of an existing plot.
+    The rotation is kept when the ticks change, e.g. after changing limits.
 
     Args:
         ax:
-            A pyplot.Axes instance
+            A pyplot.Axes instance, or an array or sequence
+            of them, such as returned by multiplot().
         which:
             A string, specifying the axis. Possible values are "x", "y", "xy", "yx", "both".
         rotation:
@@ -519,26 +2057,27 @@ def rotate_ticklabels(ax: plt.Axes, which: str, rotation: float) -> None:
         raise ValueError(
             'Parameter which must be one of "x", "y", "xy", "yx", "both".')
 
-    if not hasattr(ax, 'plot'):
-        raise ValueError("Pass a valid plot in parameter ax.")
-
-    if which in ["x", "xy", "yx", "both"]:
-        ax.set_xticklabels(ax.get_xticklabels(), rotation=rotation)
+    for axis in _flat_axes(ax):
+        if which in ["x", "xy", "yx", "both"]:
+            axis.tick_params("x", labelrotation=rotation)
 
-    if which in ["y", "xy", "yx", "both"]:
-        ax.set_yticklabels(ax.get_yticklabels(), rotation=rotation)
+        if which in ["y", "xy", "yx", "both"]:
+            axis.tick_params("y", labelrotation=rotation)
 
 
-def align_ticklabels(ax: plt.Axes,
+def align_ticklabels(ax: AxesLike,
                      which: str,
                      horizontal: Optional[str] = None,
                      vertical: Optional[str] = None) -> None:
     """Aligns tick labels of one axis of an existing plot.
     Both horizontal and vertical alignment may be specified.
+    The alignment is kept when the ticks change, e.g. after changing limits,
+    but lost when the ticks are rebuilt, e.g. after changing the scale.
 
     Args:
         ax:
-            A pyplot.Axes instance
+            A pyplot.Axes instance, or an array or sequence
+            of them, such as returned by multiplot().
         which:
             A string, specifying the axis. Possible values are "x", "y".
         horizontal:
@@ -557,24 +2096,19 @@ def align_ticklabels(ax: plt.Axes,
     if not which in ["x", "y"]:
         raise ValueError('Parameter which must be one of "x", "y".')
 
-    if not hasattr(ax, 'plot'):
-        raise ValueError("Pass a valid plot in parameter ax.")
-
-    if which == "x":
-        if horizontal is not None:
-            ax.set_xticklabels(ax.get_xticklabels(),
-                               horizontalalignment=horizontal)
-        if vertical is not None:
-            ax.set_xticklabels(ax.get_xticklabels(),
-                               verticalalignment=vertical)
+    alignment = {}
+    if horizontal is not None:
+        alignment["horizontalalignment"] = horizontal
+    if vertical is not None:
+        alignment["verticalalignment"] = vertical
 
-    if which == "y":
-        if horizontal is not None:
-            ax.set_yticklabels(ax.get_yticklabels(),
-                               horizontalalignment=horizontal)
-        if vertical is not None:
-            ax.set_yticklabels(ax.get_yticklabels(),
-                               verticalalignment=vertical)
+    # Ticks created later copy the label properties of the existing ones,
+    # so the alignment survives re-ticking without fixing the tick locator
+    for axis in _flat_axes(ax):
+        ticks = axis.xaxis if which == "x" else axis.yaxis
+        for tick in ticks.majorTicks + ticks.minorTicks:
+            tick.label1.set(**alignment)
+            tick.label2.set(**alignment)
 
 
 ##################
@@ -582,47 +2116,1037 @@ def align_ticklabels(ax: plt.Axes,
 ##################
 
 
-def save_png(filename: str, dpi: float = 300) -> None:
+def save_png(filename: str,
+             dpi: float = 300,
+             fig: Optional[matplotlib.figure.Figure] = None,
+             close: bool = False,
+             layout: Optional[Hashable] = None) -> None:
     """Exports the currently active figure as PNG file. DPI may be specified.
+    The figure is drawn only once and cropped to its tight bounding box,
+    unless it has content outside of its canvas.
 
     Args:
         filename:
             A string, containing the path and filename for exporting.
         dpi:
             An optional float, specifying the desired DPI. Defaults to 300.
+        fig:
+            An optional matplotlib.figure.Figure instance to export.
+            Defaults to None, i.e. the currently active figure.
+        close:
+            An optional bool, specifying whether to close the figure after
+            exporting it, releasing its memory. Defaults to False.
+        layout:
+            An optional hashable, naming the layout of the figure, e.g. the
+            name of its template. Figures of the same layout and size reuse
+            the tight bounding box measured for the first one, instead of
+            measuring it again. Defaults to None, i.e. measured per export.
 
     Returns:
         None
     """
-    plt.savefig(filename, dpi=dpi, bbox_inches="tight",
-                format="png")  # pragma: no cover
+    fig = _figure_or_current(fig)
+    _write_png(_render_rgba(fig, dpi, layout), filename, dpi)
+    if close:
+        _release_figure(fig)
 
 
-def save_svg(filename: str) -> None:
+def save_svg(filename: str,
+             fig: Optional[matplotlib.figure.Figure] = None,
+             close: bool = False,
+             layout: Optional[Hashable] = None) -> None:
     """Exports the currently active figure as SVG file.
 
     Args:
         filename:
             A string, containing the path and filename for exporting.
+        fig:
+            An optional matplotlib.figure.Figure instance to export.
+            Defaults to None, i.e. the currently active figure.
+        close:
+            An optional bool, specifying whether to close the figure after
+            exporting it, releasing its memory. Defaults to False.
+        layout:
+            An optional hashable, naming the layout of the figure, e.g. the
+            name of its template. Figures of the same layout and size reuse
+            the tight bounding box measured for the first one, instead of
+            measuring it again. Defaults to None, i.e. measured per export.
 
     Returns:
         None
     """
 
-    plt.savefig(filename, bbox_inches="tight",
-                format="svg")  # pragma: no cover
+    fig = _figure_or_current(fig)
+    fig.savefig(filename, bbox_inches=_tight_bbox(fig, layout), format="svg")
+    if close:
+        _release_figure(fig)
 
 
-def save_pdf(filename: str) -> None:
+def save_svg_compact(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        filename: str,
+        precision: int = 2,
+        keep_text: bool = False,
+        fig: Optional[matplotlib.figure.Figure] = None,
+        close: bool = False,
+        layout: Optional[Hashable] = None) -> None:
+    """Exports the currently active figure as size-optimized SVG file.
+    Markers and glyphs are stored once as shared definitions, as with
+    save_svg(), while all coordinates are rounded to the given precision,
+    metadata and comments are omitted, and the markup is minified.
+
+    Args:
+        filename:
+            A string, containing the path and filename for exporting.
+        precision:
+            An optional int, specifying the number of decimals of all
+            coordinates, in points. Defaults to 2.
+        keep_text:
+            An optional bool, specifying whether to keep text as text elements
+            instead of converting glyphs to paths. The result is smaller and
+            searchable, but renders with the fonts of the viewer. Unless
+            already configured accordingly, the matplotlib rcParam
+            svg.fonttype is changed globally during the export, hence
+            concurrent exports from several threads are not thread-safe.
+            Defaults to False.
+        fig:
+            An optional matplotlib.figure.Figure instance to export.
+            Defaults to None, i.e. the currently active figure.
+        close:
+            An optional bool, specifying whether to close the figure after
+            exporting it, releasing its memory. Defaults to False.
+        layout:
+            An optional hashable, naming the layout of the figure, e.g. the
+            name of its template. Figures of the same layout and size reuse
+            the tight bounding box measured for the first one, instead of
+            measuring it again. Defaults to None, i.e. measured per export.
+
+    Returns:
+        None
+    """
+
+    if not isinstance(precision, int) or precision < 0:
+        raise ValueError("Parameter precision must be a non-negative int.")
+
+    fig = _figure_or_current(fig)
+    metadata = dict.fromkeys(("Creator", "Date", "Format", "Type"))
+    fonttype = "none" if keep_text else "path"
+    if matplotlib.rcParams["svg.fonttype"] == fonttype:
+        context: Any = nullcontext()
+    else:
+        context = matplotlib.rc_context({"svg.fonttype": fonttype})
+    with context:
+        with io.StringIO() as buffer:
+            fig.savefig(buffer,
+                        bbox_inches=_tight_bbox(fig, layout),
+                        format="svg",
+                        metadata=metadata)
+            svg = buffer.getvalue()
+    with open(filename, "w", encoding="utf-8") as file:
+        file.write(_compact_svg(svg, precision))
+    if close:
+        _release_figure(fig)
+
+
+def save_pdf(filename: str,
+             fig: Optional[matplotlib.figure.Figure] = None,
+             close: bool = False,
+             layout: Optional[Hashable] = None) -> None:
     """Exports the currently active figure as PDF file.
 
     Args:
         filename:
             A string, containing the path and filename for exporting.
+        fig:
+            An optional matplotlib.figure.Figure instance to export.
+            Defaults to None, i.e. the currently active figure.
+        close:
+            An optional bool, specifying whether to close the figure after
+            exporting it, releasing its memory. Defaults to False.
+        layout:
+            An optional hashable, naming the layout of the figure, e.g. the
+            name of its template. Figures of the same layout and size reuse
+            the tight bounding box measured for the first one, instead of
+            measuring it again. Defaults to None, i.e. measured per export.
+
+    Returns:
+        None
+    """
+
+    fig = _figure_or_current(fig)
+    fig.savefig(filename, bbox_inches=_tight_bbox(fig, layout), format="pdf")
+    if close:
+        _release_figure(fig)
+
+
+def save_formats(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        basename: str,
+        formats: Sequence[str] = FORMATS,
+        dpi: float = 300,
+        fig: Optional[matplotlib.figure.Figure] = None,
+        close: bool = False,
+        layout: Optional[Hashable] = None) -> None:
+    """Exports the currently active figure to several file formats at once.
+    The tight bounding box is computed only once and shared by all formats,
+    instead of once per format as with consecutive calls of save_png(),
+    save_svg() and save_pdf().
+
+    Args:
+        basename:
+            A string, containing the path and filename for exporting,
+            without file extension. The extension is appended per format.
+        formats:
+            An optional sequence of strings, specifying the formats to export.
+            Possible values are "png", "svg", "pdf". Defaults to all three.
+        dpi:
+            An optional float, specifying the desired DPI of raster
+            formats. Defaults to 300.
+        fig:
+            An optional matplotlib.figure.Figure instance to export.
+            Defaults to None, i.e. the currently active figure.
+        close:
+            An optional bool, specifying whether to close the figure after
+            exporting it, releasing its memory. Defaults to False.
+        layout:
+            An optional hashable, naming the layout of the figure, e.g. the
+            name of its template. Figures of the same layout and size reuse
+            the tight bounding box measured for the first one, instead of
+            measuring it again. Defaults to None, i.e. measured per export.
+
+    Returns:
+        None
+    """
+
+    if not formats or any(fmt not in FORMATS for fmt in formats):
+        raise ValueError(
+            'Parameter formats must contain only "png", "svg", "pdf".')
+
+    fig = _figure_or_current(fig)
+    bbox = _tight_bbox(fig, layout)
+    for fmt in formats:
+        fig.savefig(f"{basename}.{fmt}", dpi=dpi, bbox_inches=bbox, format=fmt)
+    if close:
+        _release_figure(fig)
+
+
+def save_png_sizes(basename: str,
+                   dpis: Sequence[float] = (300, 72),
+                   fig: Optional[matplotlib.figure.Figure] = None,
+                   close: bool = False,
+                   layout: Optional[Hashable] = None) -> None:
+    """Exports the currently active figure as PNG files of several sizes,
+    e.g. a full size image, a preview and a thumbnail. The figure is drawn
+    only once at the highest DPI, and the smaller images are downsampled
+    from that, instead of drawing the figure once per call of save_png().
+
+    Args:
+        basename:
+            A string, containing the path and filename for exporting,
+            without file extension. The DPI and extension are appended
+            per size, e.g. "_300dpi.png".
+        dpis:
+            An optional sequence of floats, specifying the DPI of each
+            image. Repeated values are exported once. Defaults to 300
+            and 72.
+        fig:
+            An optional matplotlib.figure.Figure instance to export.
+            Defaults to None, i.e. the currently active figure.
+        close:
+            An optional bool, specifying whether to close the figure after
+            exporting it, releasing its memory. Defaults to False.
+        layout:
+            An optional hashable, naming the layout of the figure, e.g. the
+            name of its template. Figures of the same layout and size reuse
+            the tight bounding box measured for the first one, instead of
+            measuring it again. Defaults to None, i.e. measured per export.
+
+    Returns:
+        None
+    """
+
+    if not dpis or any(dpi <= 0 for dpi in dpis):
+        raise ValueError("Parameter dpis must contain positive numbers.")
+
+    fig = _figure_or_current(fig)
+    top = max(dpis)
+    pixels = _render_rgba(fig, top, layout)
+    # Opaque figures are written without alpha channel, which makes
+    # downsampling and encoding cheaper
+    if pixels[..., 3].min() == 255:
+        pixels = pixels[..., :3]
+    image = PIL.Image.fromarray(pixels)
+    if close:
+        _release_figure(fig)
+
+    # Each image is downsampled directly from the full size image, to avoid
+    # compounding resampling errors. A reducing gap first shrinks it by an
+    # integer factor, which keeps large reductions cheap.
+    width, height = image.size
+    for dpi in sorted(set(dpis), reverse=True):
+        size = (max(round(width * dpi / top),
+                    1), max(round(height * dpi / top), 1))
+        resized = image
+        if size != image.size:
+            resized = image.resize(size,
+                                   PIL.Image.Resampling.LANCZOS,
+                                   reducing_gap=3.0)
+        resized.save(f"{basename}_{dpi:g}dpi.png",
+                     format="png",
+                     dpi=(dpi, dpi))
+
+
+def to_bytes(fmt: str = "png",
+             dpi: float = 300,
+             fig: Optional[matplotlib.figure.Figure] = None,
+             close: bool = False,
+             layout: Optional[Hashable] = None) -> bytes:
+    """Exports the currently active figure to an in-memory buffer
+    and returns the encoded file content, without any disk I/O.
+
+    Args:
+        fmt:
+            An optional string, specifying the format. Possible values
+            are "png", "svg", "pdf". Defaults to "png".
+        dpi:
+            An optional float, specifying the desired DPI of PNG
+            outputs. Defaults to 300.
+        fig:
+            An optional matplotlib.figure.Figure instance to export.
+            Defaults to None, i.e. the currently active figure.
+        close:
+            An optional bool, specifying whether to close the figure after
+            exporting it, releasing its memory. Defaults to False.
+        layout:
+            An optional hashable, naming the layout of the figure, e.g. the
+            name of its template. Figures of the same layout and size reuse
+            the tight bounding box measured for the first one, instead of
+            measuring it again. Defaults to None, i.e. measured per export.
+
+    Returns:
+        content:
+            The encoded file content as bytes.
+    """
+
+    if fmt not in FORMATS:
+        raise ValueError('Parameter fmt must be one of "png", "svg", "pdf".')
+
+    fig = _figure_or_current(fig)
+    with io.BytesIO() as buffer:
+        if fmt == "png":
+            _write_png(_render_rgba(fig, dpi, layout), buffer, dpi)
+        else:
+            fig.savefig(buffer,
+                        dpi=dpi,
+                        bbox_inches=_tight_bbox(fig, layout),
+                        format=fmt)
+        content = buffer.getvalue()
+    if close:
+        _release_figure(fig)
+    return content
+
+
+def to_rgba(fig: Optional[matplotlib.figure.Figure] = None) -> np.ndarray:
+    """Draws the currently active figure and returns the pixels of its
+    canvas at the figure's DPI, without copying them. The returned array
+    is a view into the renderer's buffer, and is only valid until the
+    figure is drawn again or resized. Copy it to keep it longer.
+
+    Args:
+        fig:
+            An optional matplotlib.figure.Figure instance to draw.
+            Defaults to None, i.e. the currently active figure.
+
+    Returns:
+        pixels:
+            A numpy array of shape (height, width, 4) and type uint8,
+            containing the RGBA values of the figure.
+    """
+
+    fig = _figure_or_current(fig)
+    if not hasattr(fig.canvas, "buffer_rgba"):
+        raise ValueError("The figure must use an Agg-based canvas.")
+
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba())
+
+
+class AsyncExporter:
+    """Exports figures in the background. The figure is rendered on the
+    calling thread, while PNG encoding and file I/O happen on worker
+    threads, so the next figure can be built in the meantime. If too many
+    exports are pending, new exports block until one has finished.
+    Can be used as context manager, which waits for all pending exports
+    on exit.
+
+    Args:
+        max_pending:
+            An optional int, specifying the maximum number of exports
+            which are rendered but not written yet. Defaults to 8.
+        workers:
+            An optional int, specifying the number of worker threads.
+            Defaults to 1.
+    """
+
+    def __init__(self, max_pending: int = 8, workers: int = 1):
+        if max_pending < 1:
+            raise ValueError("Parameter max_pending must be at least 1.")
+        if workers < 1:
+            raise ValueError("Parameter workers must be at least 1.")
+        self._executor = concurrent.futures.ThreadPoolExecutor(workers)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pending: Set[concurrent.futures.Future] = set()
+        self._errors: List[BaseException] = []
+
+    def __enter__(self) -> AsyncExporter:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _write(self, pixels: np.ndarray, filename: str, dpi: float) -> None:
+        ''' Writes one export on a worker thread, records its error,
+        and frees its slot '''
+        try:
+            _write_png(pixels, filename, dpi)
+        except BaseException as ex:
+            with self._lock:
+                self._errors.append(ex)
+            raise
+        finally:
+            self._slots.release()
+
+    def save_png(self,
+                 filename: str,
+                 dpi: float = 300,
+                 fig: Optional[matplotlib.figure.Figure] = None,
+                 close: bool = False) -> concurrent.futures.Future:
+        """Renders the currently active figure and writes it as PNG file
+        in the background, see save_png().
+
+        Args:
+            filename:
+                A string, containing the path and filename for exporting.
+            dpi:
+                An optional float, specifying the desired DPI. Defaults to 300.
+            fig:
+                An optional matplotlib.figure.Figure instance to export.
+                Defaults to None, i.e. the currently active figure.
+            close:
+                An optional bool, specifying whether to close the figure
+                once it is rendered, releasing its memory. Defaults to False.
+
+        Returns:
+            future:
+                A concurrent.futures.Future, which is done when the file
+                has been written.
+        """
+
+        fig = _figure_or_current(fig)
+        self._slots.acquire()  # pylint: disable=consider-using-with
+        try:
+            pixels = _render_rgba(fig, dpi)
+            future = self._executor.submit(self._write, pixels, filename, dpi)
+        except BaseException:
+            self._slots.release()
+            raise
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        if close:
+            _release_figure(fig)
+        return future
+
+    def flush(self) -> None:
+        """Waits until all pending exports are written. Raises the error
+        of the first export which failed since the last flush, if any.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+
+        concurrent.futures.wait(list(self._pending))
+        with self._lock:
+            errors, self._errors = self._errors, []
+        if errors:
+            raise errors[0]
+
+    def close(self) -> None:
+        """Waits for all pending exports and stops the worker threads.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown()
+
+
+class PdfReport:
+    """Writes figures as pages into one multi-page PDF file. Fonts and other
+    resources are embedded only once for the whole report, instead of once
+    per page as when merging files exported with save_pdf(). Each figure is
+    closed after its page has been written by default, so memory usage
+    stays flat regardless of the number of pages. Can be used as context
+    manager, which finishes the file on exit.
+
+    Args:
+        filename:
+            A string, containing the path and filename of the report.
+        close:
+            An optional bool, specifying whether to close each figure after
+            writing its page, releasing its memory. Defaults to True.
+        metadata:
+            An optional dict, specifying the PDF metadata, e.g. "Title" or
+            "Author". Defaults to None, i.e. no additional metadata.
+    """
+
+    def __init__(self,
+                 filename: str,
+                 close: bool = True,
+                 metadata: Optional[Dict[str, Any]] = None):
+        self._pdf = matplotlib.backends.backend_pdf.PdfPages(filename,
+                                                             metadata=metadata)
+        self._close = close
+        self.pages = 0
+
+    def __enter__(self) -> PdfReport:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def add(self,
+            fig: Optional[matplotlib.figure.Figure] = None,
+            layout: Optional[Hashable] = None) -> None:
+        """Writes the currently active figure as next page of the report,
+        cropped to its tight bounding box.
+
+        Args:
+            fig:
+                An optional matplotlib.figure.Figure instance to write.
+                Defaults to None, i.e. the currently active figure.
+            layout:
+                An optional hashable, naming the layout of the figure, e.g. the
+                name of its template. Figures of the same layout and size reuse
+                the tight bounding box measured for the first one, instead of
+                measuring it again. Defaults to None, i.e. measured per export.
+
+        Returns:
+            None
+        """
+
+        fig = _figure_or_current(fig)
+        self._pdf.savefig(fig, bbox_inches=_tight_bbox(fig, layout))
+        self.pages += 1
+        if self._close:
+            _release_figure(fig)
+
+    def close(self) -> None:
+        """Embeds the shared fonts and resources and finishes the file.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+
+        self._pdf.close()
+
+
+def render_batch(tasks: Sequence[Tuple[Callable[[], object], str]],
+                 processes: Optional[int] = None,
+                 chunksize: Optional[int] = None,
+                 dpi: float = 300) -> List[Optional[str]]:
+    """Renders many independent figures in parallel using a pool of worker
+    processes with a headless backend. Each task consists of a callable,
+    which builds a figure (e.g. using singleplot() or multiplot()), and the
+    filename to which the figure is then exported. If the callable returns
+    a figure, or a tuple starting with one as singleplot() does, that
+    figure is exported, else pyplot's current figure. The format is
+    inferred from the file extension. The callables must be picklable,
+    i.e. defined at module level.
+
+    Args:
+        tasks:
+            A sequence of (callable, filename) tuples.
+        processes:
+            An optional int, specifying the number of worker processes.
+            Defaults to None, i.e. the number of CPUs.
+        chunksize:
+            An optional int, specifying how many tasks are sent to a
+            worker at once. Defaults to None, i.e. chosen automatically
+            from the number of tasks and processes.
+        dpi:
+            An optional float, specifying the desired DPI of PNG
+            outputs. Defaults to 300.
 
     Returns:
+        errors:
+            A list with one entry per task, containing None if the task
+            succeeded, or the formatted traceback if it failed.
+    """
+
+    if processes is not None and processes < 1:
+        raise ValueError("Parameter processes must be at least 1.")
+
+    if chunksize is not None and chunksize < 1:
+        raise ValueError("Parameter chunksize must be at least 1.")
+
+    if not tasks:
+        return []
+
+    with multiprocessing.Pool(processes, initializer=_init_worker) as pool:
+        return pool.map(_render_task,
+                        [(func, filename, dpi) for func, filename in tasks],
+                        chunksize=chunksize)
+
+
+#############
+# Templates #
+#############
+
+
+class Template:
+    """A styled figure, which is built and styled once, and then reused for
+    many charts of the same kind by swapping only their data. Each chart
+    removes the data of the previous one and restores the label texts,
+    titles and limits of the template, so that autoscaled limits follow the
+    data of each chart only. The figure, axes, spines, ticks and their
+    styling are kept. Since autoscaled tick labels and offset texts change
+    with the data, the template is no suitable layout key for save_png(),
+    save_svg() or save_pdf(), whose cached bounding box would crop them.
+
+    Args:
+        fig:
+            A matplotlib.figure.Figure instance, e.g. built with
+            singleplot() or multiplot() and styled with despine(),
+            ticklabelsize() or labels(), without any data yet.
+        ax:
+            A pyplot.Axes instance, or an array or sequence of them,
+            belonging to the figure.
+        legend_style:
+            An optional dict of named arguments for legend(), e.g. "loc" and
+            "fontsize". If given, a legend is added at the end of each chart
+            to all axes with labelled data. Defaults to None, i.e. no legend.
+    """
+
+    def __init__(self,
+                 fig: matplotlib.figure.Figure,
+                 ax: AxesLike,
+                 legend_style: Optional[Dict[str, Any]] = None):
+        if not isinstance(fig, matplotlib.figure.Figure):
+            raise ValueError("Pass a valid figure in parameter fig.")
+        self.fig = fig
+        self.ax = ax
+        self._axes = _flat_axes(ax)
+        self._legend = legend_style
+        self._artists = set(_plot_artists(fig, self._axes))
+        self._state = [(axis.get_xlabel(), axis.get_ylabel(), axis.get_title(),
+                        axis.get_xlim(), axis.get_ylim(),
+                        axis.get_autoscalex_on(), axis.get_autoscaley_on(),
+                        axis.get_legend()) for axis in self._axes]
+
+    def _restore(self) -> None:
+        ''' Removes the data of the previous chart and restores the label
+        texts, titles and limits of the template '''
+        for artist in _plot_artists(self.fig, self._axes):
+            if artist not in self._artists:
+                artist.remove()
+
+        for axis, state in zip(self._axes, self._state):
+            if axis.legend_ is not None and axis.legend_ is not state[7]:
+                axis.legend_.remove()
+            # Only the texts are replaced, keeping the styled font properties
+            axis.xaxis.label.set_text(state[0])
+            axis.yaxis.label.set_text(state[1])
+            axis.title.set_text(state[2])
+            axis.set_prop_cycle(None)
+            axis.dataLim.set_points(
+                matplotlib.transforms.Bbox.null().get_points())
+            axis.ignore_existing_data_limits = True
+            axis.set_xlim(state[3])
+            axis.set_ylim(state[4])
+            axis.set_autoscalex_on(state[5])
+            axis.set_autoscaley_on(state[6])
+
+    @contextmanager
+    def chart(self) -> Iterator[Tuple[matplotlib.figure.Figure, Any]]:
+        """Starts the next chart, restoring the template. Used as context
+        manager, which yields the figure and axes to plot the data into,
+        and adds the legends on exit. Export the chart afterwards.
+
+        Args:
+            None
+
+        Returns:
+            chart:
+                A context manager yielding the matplotlib.figure.Figure
+                instance and the axes of the template.
+        """
+
+        self._restore()
+        yield self.fig, self.ax
+        if self._legend is not None:
+            for axis in self._axes:
+                if axis.get_legend_handles_labels()[1]:
+                    legend(axis, **self._legend)
+
+    def close(self) -> None:
+        """Closes the figure of the template, releasing its memory.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+
+        _release_figure(self.fig)
+
+
+##############
+# Animations #
+##############
+
+
+class Animation:
+    """Writes an animation of a figure frame by frame into a GIF or MP4 file.
+    The figure is drawn in full only once. For each frame, only the given
+    artists are redrawn on top of the cached static background, so the
+    figure should be styled and its limits fixed before, and frames should
+    only update the data of these artists. GIF files are encoded with PIL,
+    which writes all frames at once on close(). Until then, each frame is
+    kept in memory as palette image of one byte per pixel, so memory grows
+    with the number of frames, and long animations should be written as
+    MP4 instead. MP4 files are streamed to ffmpeg, which must be installed.
+    Can be used as context manager, which closes the file on exit.
+
+    Args:
+        filename:
+            A string, containing the path and filename of the animation,
+            ending in ".gif" or ".mp4".
+        artists:
+            A list of the artists which change from frame to frame,
+            e.g. the matplotlib.lines.Line2D instances returned by ax.plot().
+        fig:
+            An optional matplotlib.figure.Figure instance to animate.
+            Defaults to None, i.e. the currently active figure.
+        fps:
+            An optional float, specifying the frames per second.
+            Defaults to 20.
+        dpi:
+            An optional float, specifying the desired DPI.
+            Defaults to None, i.e. the DPI of the figure.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+            self,
+            filename: str,
+            artists: Sequence[Any],
+            fig: Optional[matplotlib.figure.Figure] = None,
+            fps: float = 20,
+            dpi: Optional[float] = None):
+        fmt = Path(filename).suffix.lower().lstrip(".")
+        if fmt not in ("gif", "mp4"):
+            raise ValueError(
+                'Parameter filename must end in ".gif" or ".mp4".')
+        if fps <= 0:
+            raise ValueError("Parameter fps must be positive.")
+        if fmt == "mp4" and shutil.which("ffmpeg") is None:
+            raise ValueError("Writing MP4 files requires ffmpeg.")
+        self.fig = _figure_or_current(fig)
+        if not hasattr(self.fig.canvas, "copy_from_bbox"):
+            raise ValueError("Pass a figure with an Agg based canvas.")
+
+        self.filename = filename
+        self.fps = fps
+        self._artists = list(artists)
+        self._frames: List[PIL.Image.Image] = []
+        self._process: Optional[subprocess.Popen] = None
+        if dpi is not None:
+            self.fig.set_dpi(dpi)
+        for artist in self._artists:
+            artist.set_animated(True)
+        self.refresh()
+
+    def __enter__(self) -> Animation:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def refresh(self) -> None:
+        """Redraws the static background of the figure, which is needed
+        after changing anything but the data of the animated artists,
+        e.g. the axes limits.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+
+        canvas: Any = self.fig.canvas
+        canvas.draw()
+        self._background = canvas.copy_from_bbox(self.fig.bbox)
+
+    def frame(self) -> None:
+        """Draws the animated artists in their current state on top of the
+        static background, and adds the result as next frame.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+
+        canvas: Any = self.fig.canvas
+        canvas.restore_region(self._background)
+        for artist in self._artists:
+            self.fig.draw_artist(artist)
+        pixels = np.asarray(canvas.buffer_rgba())
+
+        if Path(self.filename).suffix.lower() == ".gif":
+            self._frames.append(
+                PIL.Image.fromarray(pixels[..., :3]).quantize(
+                    method=PIL.Image.Quantize.FASTOCTREE))
+            return
+
+        if self._process is None:
+            height, width = pixels.shape[:2]
+            self._process = subprocess.Popen(  # pylint: disable=consider-using-with
+                [
+                    "ffmpeg", "-y", "-loglevel", "error", "-f", "rawvideo",
+                    "-pix_fmt", "rgba", "-s", f"{width}x{height}", "-r",
+                    str(self.fps), "-i", "-", "-vf",
+                    "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p",
+                    self.filename
+                ],
+                stdin=subprocess.PIPE)
+        assert self._process.stdin is not None
+        self._process.stdin.write(pixels.tobytes())
+
+    def close(self) -> None:
+        """Finishes writing the animation file.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+
+        for artist in self._artists:
+            artist.set_animated(False)
+
+        if self._frames:
+            self._frames[0].save(self.filename,
+                                 save_all=True,
+                                 append_images=self._frames[1:],
+                                 duration=1000 / self.fps,
+                                 loop=0)
+            self._frames = []
+
+        if self._process is not None:
+            assert self._process.stdin is not None
+            self._process.stdin.close()
+            if self._process.wait() != 0:
+                raise ValueError(f"ffmpeg failed writing {self.filename}.")
+            self._process = None
+
+
+class LivePlot:
+    """A plot of streaming data, which keeps the last samples of one or
+    several series in ring buffers and redraws as little as possible. Each
+    update only redraws the lines on top of the cached static background,
+    i.e. the spines, ticks and labels. Only if new data leave the axes
+    limits, the limits are widened with some headroom and the figure is
+    redrawn in full. The axes should be styled before creating the plot.
+
+    Args:
+        ax:
+            A pyplot.Axes instance
+        series:
+            An optional int, specifying the number of series, each
+            drawn as one line. Defaults to 1.
+        capacity:
+            An optional int, specifying the number of samples kept
+            per series. Defaults to 1000.
+        margin:
+            An optional float, specifying the headroom added beyond the
+            data when widening the limits, as fraction of the data range.
+            Defaults to 0.25.
+        **kwargs:
+            Named arguments such as color, linewidth, linestyle.
+            Passed to ax.plot() for every line.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+            self,
+            ax: plt.Axes,
+            series: int = 1,
+            capacity: int = 1000,
+            margin: float = 0.25,
+            **kwargs):
+        if not hasattr(ax, 'plot'):
+            raise ValueError("Pass a valid plot in parameter ax.")
+        if series < 1 or capacity < 1:
+            raise ValueError(
+                "Parameters series and capacity must be at least 1.")
+
+        self.ax = ax
+        self.lines = [
+            ax.plot([], [], animated=True, **kwargs)[0] for _ in range(series)
+        ]
+        self.margin = margin
+        # Each sample is stored twice, one capacity apart, so that the last
+        # capacity samples are always a contiguous view of the buffer
+        self._buffer = np.zeros((series + 1, 2 * capacity))
+        self._count = 0
+        self._background: Tuple[Any, Any] = (None, None)
+        self._counts = {"updates": 0, "redraws": 0}
+
+    def append(self, x: ArrayLike, *ys: ArrayLike) -> None:
+        """Appends one or several samples to all series.
+
+        Args:
+            x:
+                A float or an array, containing the x coordinates of the
+                samples, which are shared by all series.
+            *ys:
+                One float or array per series, containing the
+                y coordinates of the samples.
+
+        Returns:
+            None
+        """
+
+        if len(ys) != len(self.lines):
+            raise ValueError("Pass one y coordinate per series.")
+        samples = np.array(np.broadcast_arrays(*np.atleast_1d(x, *ys)),
+                           dtype=float)
+        capacity = self._buffer.shape[1] // 2
+        samples = samples[:, -capacity:]
+        positions = (self._count + np.arange(samples.shape[1])) % capacity
+        self._buffer[:, positions] = samples
+        self._buffer[:, positions + capacity] = samples
+        self._count += samples.shape[1]
+
+    def _window(self) -> np.ndarray:
+        ''' Returns the kept samples in order as view of the buffer '''
+        capacity = self._buffer.shape[1] // 2
+        if self._count <= capacity:
+            return self._buffer[:, :self._count]
+        start = self._count % capacity
+        return self._buffer[:, start:start + capacity]
+
+    def _fit_limits(self, data: np.ndarray) -> bool:
+        ''' Changes the limits with headroom if the data leave them, and
+        returns whether they have changed. The x-axis follows the data,
+        while the y-axis only grows to avoid frequent redraws. '''
+        changed = False
+        for values, get_limits, set_limits, follow in ((data[0],
+                                                        self.ax.get_xlim,
+                                                        self.ax.set_xlim,
+                                                        True),
+                                                       (data[1:],
+                                                        self.ax.get_ylim,
+                                                        self.ax.set_ylim,
+                                                        False)):
+            low, high = get_limits()
+            vmin, vmax = np.nanmin(values), np.nanmax(values)
+            if low <= vmin and vmax <= high:
+                continue
+            pad = self.margin * max(vmax - vmin, 1e-9)
+            if not follow:
+                vmin, vmax = min(vmin, low), max(vmax, high)
+            set_limits(vmin - pad * (vmin < low), vmax + pad * (vmax > high))
+            changed = True
+        return changed
+
+    def update(self) -> None:
+        """Redraws the plot with the current samples.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+
+        window = self._window()
+        for line, values in zip(self.lines, window[1:]):
+            line.set_data(window[0], values)
+
+        fig = self.ax.figure
+        canvas: Any = fig.canvas
+        # The cached background is stale if the figure has been resized
+        redraw = self._background[0] != fig.bbox.bounds
+        if window.shape[1] and self._fit_limits(window):
+            redraw = True
+        if redraw:
+            canvas.draw()
+            self._background = (fig.bbox.bounds,
+                                canvas.copy_from_bbox(fig.bbox))
+            self._counts["redraws"] += 1
+        else:
+            canvas.restore_region(self._background[1])
+        for line in self.lines:
+            self.ax.draw_artist(line)
+        canvas.blit(fig.bbox)
+        self._counts["updates"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Reports how often the plot has been updated and how often
+        the figure has been redrawn in full.
+
+        Args:
+            None
+
+        Returns:
+            stats:
+                A dictionary with the counts "updates" and "redraws".
+        """
+
+        return dict(self._counts)
+
+
+##########
+# Memory #
+##########
+
+
+def memory_usage() -> Dict[str, int]:
+    """Reports the figures built by singleplot() and multiplot() which have
+    not been closed yet, neither by yaptool nor by pyplot.close(), and the
+    approximate memory they hold. This includes cached pixel buffers and
+    the data arrays of lines, collections and images, but not matplotlib's
+    internal bookkeeping.
+
+    Args:
         None
+
+    Returns:
+        usage:
+            A dictionary with the number of "open_figures", and the
+            approximate number of "bytes" held by them.
     """
 
-    plt.savefig(filename, bbox_inches="tight",
-                format="pdf")  # pragma: no cover
+    for fig, pyplot in list(_FIGURES.items()):
+        if pyplot and fig.canvas.manager is None:
+            _FIGURES.pop(fig, None)
+    figures = list(_FIGURES)
+    return {
+        "open_figures": len(figures),
+        "bytes": sum(_figure_bytes(fig) for fig in figures)
+    }